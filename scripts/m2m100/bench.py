@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Load-test a running m2m100 service and report latency, throughput and memory as JSON.
+
+Usage:
+    python3 scripts/m2m100/bench.py --concurrency 4 --requests 200
+    python3 scripts/m2m100/bench.py --rate 5 --duration 60 --corpus strings.txt --output run.json
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_URL = "http://127.0.0.1:9600"
+DEFAULT_MIX = "labels:6,sentences:3,paragraphs:1,placeholders:2"
+
+LABEL_WORDS = (
+    "Save", "Open", "Close", "Settings", "Export", "Import", "Delete", "Cancel", "Retry", "Continue",
+    "Profile", "Inventory", "Options", "Audio", "Controls", "Language", "Back", "Confirm", "Search", "Help",
+)
+SENTENCES = (
+    "Open the project settings to change the default export folder.",
+    "Your changes will be lost if you leave this page without saving.",
+    "Select a language to see the strings that still need review.",
+    "The file could not be uploaded because it is larger than the limit.",
+    "Invite a teammate to collaborate on this localization project.",
+    "Press any button to skip the cutscene.",
+    "Connection lost. Trying to reconnect to the server.",
+    "This action cannot be undone once the export has started.",
+)
+PLACEHOLDER_TEMPLATES = (
+    "Hello {name}, you have {count} new messages.",
+    "{player} defeated {enemy} and earned %d coins.",
+    "Download %1$s of %2$s complete ({percent}%).",
+    "Level {{level}} unlocked: {{reward}}",
+    "Welcome back, <b>{user}</b>! Your trial ends in {days} days.",
+    "Are you sure you want to delete \"%s\"?",
+)
+
+
+def synthetic_corpus(mix: Dict[str, int], size: int, seed: int) -> List[str]:
+  """Deterministic UI labels, sentences, paragraphs and placeholder-heavy strings."""
+  rng = random.Random(seed)
+  kinds = [kind for kind, weight in mix.items() for _ in range(weight)]
+  corpus: List[str] = []
+  for _ in range(size):
+    kind = rng.choice(kinds)
+    if kind == "labels":
+      corpus.append(" ".join(rng.sample(LABEL_WORDS, rng.randint(1, 3))))
+    elif kind == "sentences":
+      corpus.append(rng.choice(SENTENCES))
+    elif kind == "paragraphs":
+      corpus.append(" ".join(rng.sample(SENTENCES, rng.randint(3, 6))))
+    else:
+      corpus.append(rng.choice(PLACEHOLDER_TEMPLATES))
+  return corpus
+
+
+def load_corpus(path: Path) -> List[str]:
+  """Read recorded strings from .txt (one per line), .json (list) or .jsonl files."""
+  text = path.read_text(encoding="utf-8")
+  if path.suffix == ".json":
+    rows = json.loads(text)
+  elif path.suffix == ".jsonl":
+    rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+  else:
+    return [line for line in text.splitlines() if line.strip()]
+  return [row["source_text"] if isinstance(row, dict) else str(row) for row in rows]
+
+
+def parse_mix(spec: str) -> Dict[str, int]:
+  mix: Dict[str, int] = {}
+  for part in spec.split(","):
+    kind, _, weight = part.partition(":")
+    if kind not in {"labels", "sentences", "paragraphs", "placeholders"}:
+      raise argparse.ArgumentTypeError(f"Unknown corpus kind: {kind}")
+    mix[kind] = int(weight or 1)
+  return mix
+
+
+def http_json(url: str, payload: Optional[Dict[str, Any]] = None, timeout: float = 120.0) -> Any:
+  data = json.dumps(payload).encode("utf-8") if payload is not None else None
+  request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+  with urllib.request.urlopen(request, timeout=timeout) as response:
+    return json.loads(response.read())
+
+
+def scrape_counters(base_url: str) -> Dict[str, float]:
+  """Unlabelled counters from /metrics; empty when the service predates the endpoint."""
+  try:
+    with urllib.request.urlopen(f"{base_url}/metrics", timeout=10) as response:
+      text = response.read().decode("utf-8")
+  except (urllib.error.URLError, OSError):
+    return {}
+  counters: Dict[str, float] = {}
+  for line in text.splitlines():
+    name, _, value = line.partition(" ")
+    if name.endswith("_total") and "{" not in name:
+      counters[name] = float(value)
+  return counters
+
+
+def find_server_pid(port: int) -> Optional[int]:
+  output = subprocess.run(["ps", "-A", "-o", "pid=,command="], capture_output=True, text=True).stdout
+  for line in output.splitlines():
+    pid, _, command = line.strip().partition(" ")
+    executable, *arguments = command.split()
+    # Skip shells and wrappers (timeout, nohup) whose command line merely mentions the script.
+    if not Path(executable).name.startswith("python") or not any(arg.endswith("m2m100_service.py") for arg in arguments):
+      continue
+    if f"--port {port}" in command or f"--port={port}" in command:
+      return int(pid)
+  return None
+
+
+class RssSampler:
+  """Polls the resident set size of a process and its children (e.g. ``--workers``)."""
+
+  def __init__(self, pid: int, interval_s: float = 0.25) -> None:
+    self.pid = pid
+    self.interval = interval_s
+    self.peak_bytes = 0
+    self._stop = threading.Event()
+    self._thread = threading.Thread(target=self._run, daemon=True)
+
+  def sample(self) -> int:
+    output = subprocess.run(["ps", "-A", "-o", "pid=,ppid=,rss="], capture_output=True, text=True).stdout
+    rss = {}
+    parents = {}
+    for line in output.splitlines():
+      pid, ppid, kilobytes = (int(field) for field in line.split())
+      rss[pid] = kilobytes * 1024
+      parents[pid] = ppid
+    family = {self.pid}
+    while True:
+      children = {pid for pid, parent in parents.items() if parent in family} - family
+      if not children:
+        break
+      family |= children
+    return sum(rss.get(pid, 0) for pid in family)
+
+  def _run(self) -> None:
+    while not self._stop.is_set():
+      self.peak_bytes = max(self.peak_bytes, self.sample())
+      self._stop.wait(self.interval)
+
+  def __enter__(self) -> RssSampler:
+    self._thread.start()
+    return self
+
+  def __exit__(self, *exc: Any) -> None:
+    self._stop.set()
+    self._thread.join()
+
+
+def percentile(ordered: List[float], fraction: float) -> Optional[float]:
+  if not ordered:
+    return None
+  return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+class Runner:
+  def __init__(self, args: argparse.Namespace, corpus: List[str]) -> None:
+    self.url = f"{args.url}/translate"
+    self.args = args
+    self.corpus = corpus
+    self.latencies: List[float] = []
+    self.errors: Dict[str, int] = {}
+    self._lock = threading.Lock()
+
+  def payload(self, index: int) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "source_text": self.corpus[index % len(self.corpus)],
+        "target_languages": self.args.target_languages,
+        "use_cache": self.args.use_cache,
+    }
+    if self.args.beam_size:
+      payload["beam_size"] = self.args.beam_size
+    return payload
+
+  def send(self, index: int, scheduled: float) -> None:
+    # Latency runs from the scheduled start so a slow server cannot hide queueing delay.
+    try:
+      http_json(self.url, self.payload(index), timeout=self.args.timeout)
+    except urllib.error.HTTPError as exc:
+      self._error(f"http_{exc.code}")
+    except (urllib.error.URLError, OSError) as exc:
+      self._error(type(getattr(exc, "reason", exc)).__name__)
+    else:
+      with self._lock:
+        self.latencies.append(time.perf_counter() - scheduled)
+
+  def _error(self, kind: str) -> None:
+    with self._lock:
+      self.errors[kind] = self.errors.get(kind, 0) + 1
+
+  def closed_loop(self, concurrency: int, requests: int, deadline: Optional[float]) -> None:
+    counter = iter(range(requests))
+    counter_lock = threading.Lock()
+
+    def client() -> None:
+      while deadline is None or time.perf_counter() < deadline:
+        with counter_lock:
+          index = next(counter, None)
+        if index is None:
+          return
+        self.send(index, time.perf_counter())
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+
+  def open_loop(self, rate: float, requests: int, deadline: Optional[float], seed: int) -> None:
+    """Poisson arrivals at ``rate`` per second, independent of how fast responses come back."""
+    rng = random.Random(seed)
+    with ThreadPoolExecutor(max_workers=self.args.max_in_flight) as pool:
+      scheduled = time.perf_counter()
+      for index in range(requests):
+        scheduled += rng.expovariate(rate)
+        if deadline is not None and scheduled >= deadline:
+          break
+        time.sleep(max(0.0, scheduled - time.perf_counter()))
+        pool.submit(self.send, index, scheduled)
+
+
+def summarize(latencies: List[float]) -> Dict[str, Optional[float]]:
+  ordered = sorted(latencies)
+
+  def ms(value: Optional[float]) -> Optional[float]:
+    return round(value * 1000, 2) if value is not None else None
+
+  return {
+      "p50": ms(percentile(ordered, 0.50)),
+      "p95": ms(percentile(ordered, 0.95)),
+      "p99": ms(percentile(ordered, 0.99)),
+      "mean": ms(sum(ordered) / len(ordered)) if ordered else None,
+      "max": ms(ordered[-1]) if ordered else None,
+  }
+
+
+def parse_args() -> argparse.Namespace:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--url", default=DEFAULT_URL, help="Base URL of the running service.")
+  load = parser.add_mutually_exclusive_group()
+  load.add_argument("--concurrency", type=int, default=4, help="Closed loop: clients each sending back-to-back.")
+  load.add_argument("--rate", type=float, help="Open loop: Poisson arrivals per second.")
+  parser.add_argument("--requests", type=int, default=200, help="Requests to send (after warmup).")
+  parser.add_argument("--duration", type=float, help="Stop sending after this many seconds.")
+  parser.add_argument("--warmup", type=int, default=5, help="Requests sent and discarded before measuring.")
+  parser.add_argument("--corpus", type=Path, help="Recorded strings (.txt, .json or .jsonl) instead of synthetic ones.")
+  parser.add_argument(
+      "--mix",
+      type=parse_mix,
+      default=parse_mix(DEFAULT_MIX),
+      help=f"Synthetic corpus weights (default: {DEFAULT_MIX}).",
+  )
+  parser.add_argument("--corpus-size", type=int, default=500, help="Synthetic corpus size.")
+  parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic corpus and arrival times.")
+  parser.add_argument("--target-languages", nargs="+", default=["es", "fr", "de"], help="Languages per request.")
+  parser.add_argument("--beam-size", type=int, help="Send an explicit beam size instead of the server's policy.")
+  parser.add_argument(
+      "--use-cache",
+      action="store_true",
+      help="Let the server answer from its caches (off by default so every request hits the model).",
+  )
+  parser.add_argument("--max-in-flight", type=int, default=256, help="Open loop: cap on outstanding requests.")
+  parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds.")
+  parser.add_argument("--server-pid", type=int, help="Process to sample RSS from (found by port when omitted).")
+  parser.add_argument("--label", help="Free-form name stored in the report, e.g. the config under test.")
+  parser.add_argument("--output", type=Path, help="Write the JSON report here instead of stdout.")
+  return parser.parse_args()
+
+
+def main() -> None:
+  args = parse_args()
+  corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.mix, args.corpus_size, args.seed)
+  if not corpus:
+    raise SystemExit("The corpus is empty.")
+  try:
+    metadata = http_json(f"{args.url}/metadata", timeout=10)
+  except (urllib.error.URLError, OSError) as exc:
+    raise SystemExit(f"Service not reachable at {args.url}: {exc}") from exc
+
+  runner = Runner(args, corpus)
+  if args.warmup:
+    print(f"🔥 Warming up with {args.warmup} requests", file=sys.stderr)
+    runner.closed_loop(1, args.warmup, None)
+    runner = Runner(args, corpus)
+
+  pid = args.server_pid or find_server_pid(urllib.parse.urlsplit(args.url).port or 80)
+  if pid is None:
+    print("⚠️  Server process not found; peak RSS will not be reported (pass --server-pid).", file=sys.stderr)
+  mode = f"open loop at {args.rate}/s" if args.rate else f"closed loop with {args.concurrency} clients"
+  print(f"🚀 Sending {args.requests} requests ({mode})", file=sys.stderr)
+
+  before = scrape_counters(args.url)
+  sampler = RssSampler(pid) if pid is not None else None
+  started = time.perf_counter()
+  deadline = started + args.duration if args.duration else None
+  with sampler or contextlib.nullcontext():
+    if args.rate:
+      runner.open_loop(args.rate, args.requests, deadline, args.seed)
+    else:
+      runner.closed_loop(args.concurrency, args.requests, deadline)
+  elapsed = time.perf_counter() - started
+  after = scrape_counters(args.url)
+
+  def per_second(name: str) -> Optional[float]:
+    if name not in before or name not in after:
+      return None
+    return round((after[name] - before[name]) / elapsed, 2)
+
+  completed = len(runner.latencies)
+  report = {
+      "label": args.label,
+      "timestamp": datetime.now(timezone.utc).isoformat(),
+      "host": {"platform": platform.platform(), "python": platform.python_version()},
+      "load": {
+          "mode": "open" if args.rate else "closed",
+          "rate": args.rate,
+          "concurrency": None if args.rate else args.concurrency,
+          "requests": args.requests,
+          "duration_s": args.duration,
+          "target_languages": args.target_languages,
+          "beam_size": args.beam_size,
+          "use_cache": args.use_cache,
+          "corpus": str(args.corpus) if args.corpus else {"synthetic": args.mix, "size": args.corpus_size},
+          "seed": args.seed,
+      },
+      "server": {
+          key: metadata.get(key)
+          for key in ("model_revision", "device", "backend", "precision", "beam_size", "workers", "threads", "decoding_policy")
+      },
+      "results": {
+          "completed": completed,
+          "errors": runner.errors,
+          "elapsed_s": round(elapsed, 3),
+          "requests_per_second": round(completed / elapsed, 2),
+          "latency_ms": summarize(runner.latencies),
+          "input_tokens_per_second": per_second("m2m100_input_tokens_total"),
+          "output_tokens_per_second": per_second("m2m100_output_tokens_total"),
+          "peak_rss_mb": round(sampler.peak_bytes / 2**20, 1) if sampler is not None else None,
+      },
+  }
+  rendered = json.dumps(report, indent=2)
+  if args.output:
+    args.output.write_text(rendered + "\n", encoding="utf-8")
+    print(f"✅ Report saved to {args.output}", file=sys.stderr)
+  else:
+    print(rendered)
+
+
+if __name__ == "__main__":
+  main()
@@ -14,7 +14,7 @@ import os
 from datetime import datetime, timezone
 from pathlib import Path
 import shutil
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 try:
   from huggingface_hub import snapshot_download
@@ -27,6 +27,11 @@ except ImportError as exc:  # pragma: no cover - import guard
 DEFAULT_MODEL_ID = "facebook/m2m100_418M"
 DEFAULT_TARGET = Path.home() / ".locax" / "models" / "m2m100_418M"
 REGISTRY_PATH = Path.home() / ".locax" / "models" / "registry.json"
+PICKLED_WEIGHTS = ("pytorch_model.bin", "pytorch_model.bin.index.json")
+# int8 is quantized when the service loads the model, from float32 weights. "auto" keeps
+# the upstream float32, which is what the service runs on CPU, so the mapped weights are
+# used in place; float16 is lossy and only stored when asked for.
+STORED_DTYPES = {"auto": "float32", "float16": "float16", "float32": "float32", "int8": "float32"}
 
 
 def sha256sum(file_path: Path) -> str:
@@ -37,7 +42,13 @@ def sha256sum(file_path: Path) -> str:
   return hasher.hexdigest()
 
 
-def build_manifest(target_dir: Path, model_id: str, revision: str, precision: str) -> Dict[str, Any]:
+def build_manifest(
+    target_dir: Path,
+    model_id: str,
+    revision: str,
+    precision: str,
+    weights: Dict[str, str],
+) -> Dict[str, Any]:
   artifacts: List[Dict[str, Any]] = []
   for file_path in sorted(target_dir.rglob("*")):
     if file_path.is_file():
@@ -54,32 +65,124 @@ def build_manifest(target_dir: Path, model_id: str, revision: str, precision: st
       "model_id": model_id,
       "revision": revision,
       "precision": precision,
+      "weights": weights,
       "downloaded_at": datetime.now(timezone.utc).isoformat(),
       "artifacts": artifacts,
   }
 
 
-def persist_registry_entry(target_dir: Path, manifest: Dict[str, Any]) -> None:
+def convert_safetensors(target_dir: Path, precision: str) -> Dict[str, str]:
+  """Re-save the pickled checkpoint as ``model.safetensors`` in the stored dtype.
+
+  safetensors files are memory-mapped by the service, so restarts and sibling
+  processes share the page cache instead of unpickling ~1.6 GB into private memory.
+  """
+  try:
+    import torch
+    from transformers import M2M100ForConditionalGeneration
+  except ImportError as exc:
+    raise SystemExit(
+        "Converting to safetensors requires torch and transformers. "
+        "Install deps via `pip install -r server/requirements-m2m100.txt` or pass --keep-pickle."
+    ) from exc
+
+  dtype = STORED_DTYPES[precision]
+  print(f"🔁 Converting weights to safetensors ({dtype})")
+  model = M2M100ForConditionalGeneration.from_pretrained(
+      target_dir,
+      torch_dtype=getattr(torch, dtype),
+      low_cpu_mem_usage=True,
+  )
+  model.save_pretrained(target_dir, safe_serialization=True)
+  for name in PICKLED_WEIGHTS:
+    (target_dir / name).unlink(missing_ok=True)
+  return {"format": "safetensors", "dtype": dtype}
+
+
+def reusable_weights(target_dir: Path, model_id: str, revision: str, precision: str) -> Optional[Dict[str, str]]:
+  """The ``weights`` entry of an earlier conversion in ``target_dir``, if it matches this run."""
+  try:
+    with (target_dir / "manifest-lock.json").open("r", encoding="utf-8") as handle:
+      manifest = json.load(handle)
+  except (OSError, json.JSONDecodeError):
+    return None
+  weights = manifest.get("weights") or {}
+  if (
+      manifest.get("model_id") != model_id
+      or manifest.get("revision") != revision
+      or weights.get("format") != "safetensors"
+      or weights.get("dtype") != STORED_DTYPES[precision]
+      or not (target_dir / "model.safetensors").exists()
+  ):
+    return None
+  return weights
+
+
+def export_onnx(target_dir: Path) -> Path:
+  try:
+    from optimum.exporters.onnx import main_export
+  except ImportError as exc:
+    raise SystemExit("--export-onnx requires optimum. Install it via `pip install optimum[onnxruntime]`.") from exc
+
+  output_dir = target_dir / "onnx"
+  print(f"📦 Exporting ONNX encoder and decoder-with-past to {output_dir}")
+  main_export(str(target_dir), output=output_dir, task="text2text-generation-with-past")
+  return output_dir
+
+
+def convert_ctranslate2(target_dir: Path, quantization: str) -> Path:
+  try:
+    from ctranslate2.converters import TransformersConverter
+  except ImportError as exc:
+    raise SystemExit("--convert-ctranslate2 requires ctranslate2. Install it via `pip install ctranslate2`.") from exc
+
+  output_dir = target_dir / "ctranslate2"
+  print(f"⚙️  Converting weights to CTranslate2 ({quantization}) in {output_dir}")
+  TransformersConverter(str(target_dir)).convert(str(output_dir), quantization=quantization, force=True)
+  return output_dir
+
+
+def load_registry() -> Dict[str, Any]:
+  registry_path = REGISTRY_PATH.expanduser()
+  if not registry_path.exists():
+    return {}
+  with registry_path.open("r", encoding="utf-8") as handle:
+    try:
+      return json.load(handle)
+    except json.JSONDecodeError:
+      return {}
+
+
+def save_registry(data: Dict[str, Any]) -> None:
   registry_path = REGISTRY_PATH.expanduser()
   registry_path.parent.mkdir(parents=True, exist_ok=True)
-  if registry_path.exists():
-    with registry_path.open("r", encoding="utf-8") as handle:
-      try:
-        data = json.load(handle)
-      except json.JSONDecodeError:
-        data = {}
-  else:
-    data = {}
+  with registry_path.open("w", encoding="utf-8") as handle:
+    json.dump(data, handle, indent=2)
 
+
+def persist_registry_entry(target_dir: Path, manifest: Dict[str, Any]) -> None:
+  data = load_registry()
   data[manifest["model_id"]] = {
       "path": str(target_dir),
       "revision": manifest["revision"],
       "precision": manifest["precision"],
       "downloaded_at": manifest["downloaded_at"],
   }
+  save_registry(data)
 
-  with registry_path.open("w", encoding="utf-8") as handle:
-    json.dump(data, handle, indent=2)
+
+def persist_ctranslate2_entry(converted_dir: Path, manifest: Dict[str, Any], quantization: str) -> None:
+  """Register the converted copy next to the original as ``<model_id>:ctranslate2``."""
+  data = load_registry()
+  data[f"{manifest['model_id']}:ctranslate2"] = {
+      "path": str(converted_dir),
+      "source": manifest["model_id"],
+      "revision": manifest["revision"],
+      "format": "ctranslate2",
+      "quantization": quantization,
+      "converted_at": datetime.now(timezone.utc).isoformat(),
+  }
+  save_registry(data)
 
 
 def parse_args() -> argparse.Namespace:
@@ -93,9 +196,17 @@ def parse_args() -> argparse.Namespace:
   )
   parser.add_argument(
       "--precision",
-      choices=["float16", "float32", "int8"],
-      default="float16",
-      help="Recorded precision preference. Actual quantization happens when the service loads the model.",
+      choices=["auto", "float16", "float32", "int8"],
+      default="auto",
+      help=(
+          "Target precision. Weights are stored as float32 safetensors unless float16 is "
+          "given; int8 is quantized when the service loads the model."
+      ),
+  )
+  parser.add_argument(
+      "--keep-pickle",
+      action="store_true",
+      help="Skip the safetensors conversion and keep the downloaded pytorch_model.bin.",
   )
   parser.add_argument(
       "--token",
@@ -113,6 +224,22 @@ def parse_args() -> argparse.Namespace:
       default=5,
       help="Max concurrent downloads passed to huggingface_hub.",
   )
+  parser.add_argument(
+      "--export-onnx",
+      action="store_true",
+      help="Also export an ONNX Runtime copy to <target-dir>/onnx for `m2m100_service.py --backend onnx`.",
+  )
+  parser.add_argument(
+      "--convert-ctranslate2",
+      action="store_true",
+      help="Also convert the weights for `m2m100_service.py --backend ctranslate2` into <target-dir>/ctranslate2.",
+  )
+  parser.add_argument(
+      "--ct2-quantization",
+      choices=["int8", "int8_float16", "int16", "float16", "float32"],
+      default="int8",
+      help="Weight type stored in the CTranslate2 conversion.",
+  )
   return parser.parse_args()
 
 
@@ -125,6 +252,9 @@ def main() -> None:
     shutil.rmtree(target_dir)
 
   target_dir.mkdir(parents=True, exist_ok=True)
+  # The pickled checkpoint is deleted after conversion; don't fetch ~1.6 GB again just
+  # to convert it to the same safetensors file.
+  converted = None if args.keep_pickle else reusable_weights(target_dir, args.model_id, args.revision, args.precision)
 
   print(f"⬇️  Downloading {args.model_id}@{args.revision} to {target_dir}")
   snapshot_download(
@@ -135,13 +265,27 @@ def main() -> None:
       resume_download=True,
       token=args.token,
       max_workers=args.max_workers,
+      ignore_patterns=[*PICKLED_WEIGHTS, "model.safetensors"] if converted else None,
   )
-  manifest = build_manifest(target_dir, args.model_id, args.revision, args.precision)
+  if converted:
+    print(f"♻️  Reusing converted safetensors weights ({converted['dtype']})")
+    weights = converted
+  elif args.keep_pickle:
+    weights = {"format": "pytorch", "dtype": "float32"}
+  else:
+    weights = convert_safetensors(target_dir, args.precision)
+  if args.export_onnx:
+    export_onnx(target_dir)
+  converted_dir = convert_ctranslate2(target_dir, args.ct2_quantization) if args.convert_ctranslate2 else None
+
+  manifest = build_manifest(target_dir, args.model_id, args.revision, args.precision, weights)
   manifest_path = target_dir / "manifest-lock.json"
   with manifest_path.open("w", encoding="utf-8") as handle:
     json.dump(manifest, handle, indent=2)
 
   persist_registry_entry(target_dir, manifest)
+  if converted_dir is not None:
+    persist_ctranslate2_entry(converted_dir, manifest, args.ct2_quantization)
   print(f"✅ Download complete. Manifest saved to {manifest_path}")
 
 
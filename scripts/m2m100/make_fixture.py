@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Write a tiny, randomly initialized M2M100 model directory for offline tests and benchmarks.
+
+The fixture has the same layout as a fetched snapshot (config, safetensors weights,
+sentencepiece tokenizer with every M2M100 language token, manifest-lock.json), so
+`server/m2m100_service.py --model-path` loads it in seconds. Its translations are
+noise; only the serving code paths are realistic.
+
+Usage:
+    python3 scripts/m2m100/make_fixture.py --target-dir ~/.locax/models/m2m100_tiny
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import random
+import shutil
+from pathlib import Path
+from typing import List
+
+from fetch import build_manifest, persist_registry_entry
+
+DEFAULT_TARGET = Path.home() / ".locax" / "models" / "m2m100_tiny"
+FIXTURE_MODEL_ID = "locax/m2m100-tiny-random"
+SPECIAL_TOKENS = ("<s>", "<pad>", "</s>", "<unk>")
+# Sentencepiece training text: localization-style vocabulary plus placeholder syntax.
+CORPUS_WORDS = (
+    "save cancel open close file project settings language translate export import delete retry "
+    "continue profile inventory options audio controls back confirm search help hello world the a "
+    "of to and is you your click button level unlocked download complete messages welcome trial "
+    "days player enemy coins game progress checkpoint menu cloud connection lost server "
+    "{name} {count} %s %d {{value}} <b> </b> café über naïve"
+).split()
+
+
+def train_tokenizer(target_dir: Path, vocab_size: int, seed: int) -> None:
+  """Train a BPE sentencepiece model and write it with the matching ``vocab.json``."""
+  try:
+    import sentencepiece as spm
+  except ImportError as exc:
+    raise SystemExit("sentencepiece is required. Install deps via `pip install -r server/requirements-m2m100.txt`.") from exc
+
+  rng = random.Random(seed)
+  corpus = [" ".join(rng.choice(CORPUS_WORDS) for _ in range(rng.randint(1, 12))) for _ in range(4000)]
+  model = io.BytesIO()
+  spm.SentencePieceTrainer.train(
+      sentence_iterator=iter(corpus),
+      model_writer=model,
+      vocab_size=vocab_size,
+      model_type="bpe",
+      character_coverage=1.0,
+      bos_id=-1,
+      eos_id=-1,
+      pad_id=-1,
+      unk_id=0,
+      num_threads=1,  # deterministic merges
+      minloglevel=2,
+  )
+  (target_dir / "sentencepiece.bpe.model").write_bytes(model.getvalue())
+  processor = spm.SentencePieceProcessor(model_proto=model.getvalue())
+  # Same layout as the real checkpoint: fairseq specials first, then the pieces.
+  vocab = {token: index for index, token in enumerate(SPECIAL_TOKENS)}
+  for piece_id in range(processor.get_piece_size()):
+    vocab.setdefault(processor.id_to_piece(piece_id), len(vocab))
+  with (target_dir / "vocab.json").open("w", encoding="utf-8") as handle:
+    json.dump(vocab, handle, ensure_ascii=False, indent=2)
+
+
+def build_model(target_dir: Path, args: argparse.Namespace) -> None:
+  try:
+    import torch
+    from transformers import M2M100Config, M2M100ForConditionalGeneration, M2M100Tokenizer
+    from transformers.models.m2m_100.tokenization_m2m_100 import FAIRSEQ_LANGUAGE_CODES
+  except ImportError as exc:
+    raise SystemExit(
+        "torch and transformers are required. Install deps via `pip install -r server/requirements-m2m100.txt`."
+    ) from exc
+
+  language_tokens: List[str] = [f"__{code}__" for code in FAIRSEQ_LANGUAGE_CODES["m2m100"]]
+  tokenizer = M2M100Tokenizer(
+      str(target_dir / "vocab.json"),
+      str(target_dir / "sentencepiece.bpe.model"),
+      additional_special_tokens=language_tokens,
+  )
+  config = M2M100Config(
+      # The tokenizer appends the language tokens and fairseq's 8 "madeup" words after the pieces.
+      vocab_size=max(tokenizer.lang_token_to_id.values()) + 1 + 8,
+      d_model=args.d_model,
+      encoder_layers=args.layers,
+      decoder_layers=args.layers,
+      encoder_attention_heads=args.heads,
+      decoder_attention_heads=args.heads,
+      encoder_ffn_dim=args.d_model * 4,
+      decoder_ffn_dim=args.d_model * 4,
+      max_position_embeddings=1024,
+      encoder_layerdrop=0.0,
+      decoder_layerdrop=0.0,
+      # Wider than the usual 0.02, so greedy decoding emits varied tokens and EOS instead
+      # of one token repeated to max_length.
+      init_std=0.6,
+      pad_token_id=tokenizer.pad_token_id,
+      bos_token_id=tokenizer.bos_token_id,
+      eos_token_id=tokenizer.eos_token_id,
+      decoder_start_token_id=tokenizer.eos_token_id,
+  )
+  torch.manual_seed(args.seed)
+  model = M2M100ForConditionalGeneration(config).to(getattr(torch, args.precision)).eval()
+  model.save_pretrained(target_dir, safe_serialization=True)
+  tokenizer.save_pretrained(target_dir)
+  parameters = sum(parameter.numel() for parameter in model.parameters())
+  print(f"🧪 {parameters / 1e6:.2f}M parameters, {config.vocab_size} tokens ({len(language_tokens)} languages)")
+
+
+def parse_args() -> argparse.Namespace:
+  parser = argparse.ArgumentParser(description="Generate a tiny random M2M100 model for offline tests and benchmarks.")
+  parser.add_argument("--target-dir", type=Path, default=DEFAULT_TARGET, help="Output directory.")
+  parser.add_argument("--vocab-size", type=int, default=256, help="Sentencepiece pieces before language tokens.")
+  parser.add_argument("--d-model", type=int, default=64, help="Hidden size (feed-forward is 4x).")
+  parser.add_argument("--layers", type=int, default=2, help="Encoder and decoder layers each.")
+  parser.add_argument("--heads", type=int, default=4, help="Attention heads per layer.")
+  parser.add_argument("--precision", choices=["float32", "float16"], default="float32", help="Stored dtype.")
+  parser.add_argument("--seed", type=int, default=0, help="Seed for the tokenizer corpus and the weights.")
+  parser.add_argument("--register", action="store_true", help=f"Add the fixture to the registry as {FIXTURE_MODEL_ID}.")
+  parser.add_argument("--clean", action="store_true", help="Remove the target directory first.")
+  return parser.parse_args()
+
+
+def main() -> None:
+  args = parse_args()
+  target_dir = args.target_dir.expanduser().resolve()
+  if args.clean and target_dir.exists():
+    print(f"🧹 Removing existing files in {target_dir}")
+    shutil.rmtree(target_dir)
+  target_dir.mkdir(parents=True, exist_ok=True)
+  (target_dir / "manifest-lock.json").unlink(missing_ok=True)  # regenerated below
+
+  print(f"🔤 Training a {args.vocab_size}-piece tokenizer in {target_dir}")
+  train_tokenizer(target_dir, args.vocab_size, args.seed)
+  build_model(target_dir, args)
+
+  revision = f"tiny-random-d{args.d_model}-l{args.layers}-seed{args.seed}"
+  weights = {"format": "safetensors", "dtype": args.precision}
+  manifest = build_manifest(target_dir, FIXTURE_MODEL_ID, revision, args.precision, weights)
+  manifest_path = target_dir / "manifest-lock.json"
+  with manifest_path.open("w", encoding="utf-8") as handle:
+    json.dump(manifest, handle, indent=2)
+  if args.register:
+    persist_registry_entry(target_dir, manifest)
+  print(f"✅ Fixture ready. Serve it with: python3 server/m2m100_service.py --model-path {target_dir}")
+
+
+if __name__ == "__main__":
+  main()
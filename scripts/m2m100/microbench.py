@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Time the m2m100 inference hot path in-process and compare it against a stored baseline.
+
+Usage:
+    python3 scripts/m2m100/microbench.py --save-baseline
+    python3 scripts/m2m100/microbench.py --precisions float32 int8 --beams 1 4
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+from dataclasses import replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "server"))
+import m2m100_service as service  # noqa: E402
+
+DEFAULT_BASELINE = Path.home() / ".locax" / "bench" / "microbench-baseline.json"
+STAGES = ("tokenize", "encoder", "decode_loop", "detokenize", "generate_batch")
+# Differences below this are timer noise, whatever the ratio.
+NOISE_FLOOR_MS = 0.5
+SOURCE_PARAGRAPH = (
+    "Your progress is saved automatically every few minutes. If the game closes unexpectedly, "
+    "you can continue from the last checkpoint by selecting Continue on the main menu. "
+    "Cloud saves are synchronized when you reconnect to the internet, and older saves "
+    "remain available from the Load Game screen for thirty days. "
+)
+
+
+def source_of_length(tokens: int) -> str:
+  """Text that tokenizes to about ``tokens`` source tokens."""
+  tokenizer = service._tokenizer
+  ids: List[int] = []
+  while len(ids) < tokens:
+    ids += tokenizer(SOURCE_PARAGRAPH, add_special_tokens=False)["input_ids"]
+  return tokenizer.decode(ids[:tokens], skip_special_tokens=True)
+
+
+def load_runtime(config: service.ServiceConfig) -> None:
+  service.configure_service(config)
+  asyncio.run(service.load_runtime())
+
+
+def time_call(func: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+  started = time.perf_counter()
+  result = func(*args)
+  return result, (time.perf_counter() - started) * 1000
+
+
+def run_encoder(backend: Any, input_ids: Any, attention_mask: Any) -> Any:
+  with service.torch.inference_mode():
+    return backend.model.get_encoder()(input_ids=input_ids, attention_mask=attention_mask, return_dict=True)
+
+
+def measure_case(batch: int, length: int, beam: int, args: argparse.Namespace) -> Dict[str, Any]:
+  """Median and minimum milliseconds per stage for one (batch, length, beam) cell."""
+  backend = service._backend
+  tokenizer = service._tokenizer
+  texts = [source_of_length(length)] * batch
+  languages = [args.source_language] * batch
+  lang_id = service.resolve_lang_id(tokenizer, args.target_language)
+  decoder_input_ids = service.torch.tensor([[backend.decoder_start_token_id, lang_id]] * batch)
+  samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+  output_tokens = 0
+  for round_index in range(args.warmup + args.repeat):
+    (input_ids, attention_mask), tokenize_ms = time_call(service.encode_sources, texts, languages)
+    # Only the transformers backends expose the encoder separately; CTranslate2
+    # reports its whole translate call as the decode loop.
+    encoder_ms = 0.0
+    if hasattr(backend, "model"):
+      _, encoder_ms = time_call(run_encoder, backend, input_ids, attention_mask)
+    generated, generate_ms = time_call(
+        backend.generate,
+        input_ids,
+        attention_mask,
+        list(range(batch)),
+        decoder_input_ids,
+        args.new_tokens,
+        beam,
+        args.no_repeat_ngram_size,
+    )
+    _, detokenize_ms = time_call(tokenizer.batch_decode, generated, True)
+    # Fresh budget each round, so adaptive length ratios cannot drift between runs.
+    config = service.SERVICE_CONFIG
+    service._decode_budget = service.DecodeBudget(config.length_ratios, config.decode_slack)
+    _, batch_ms = time_call(
+        service.generate_batch,
+        texts,
+        languages,
+        [[args.target_language]] * batch,
+        args.new_tokens + 2,
+        beam,
+        args.no_repeat_ngram_size,
+    )
+    if round_index < args.warmup:
+      continue
+    # generate() runs the encoder once more itself; the rest is the decode loop.
+    for stage, value in zip(
+        STAGES, (tokenize_ms, encoder_ms, max(0.0, generate_ms - encoder_ms), detokenize_ms, batch_ms)
+    ):
+      samples[stage].append(value)
+    output_tokens = int((generated[:, 2:] != tokenizer.pad_token_id).sum())
+  return {
+      "stages_ms": {
+          stage: {"median": round(statistics.median(values), 3), "min": round(min(values), 3)}
+          for stage, values in samples.items()
+          if values and (stage != "encoder" or hasattr(backend, "model"))
+      },
+      "source_tokens": int(input_ids.shape[1]) - 2,
+      "output_tokens": output_tokens,
+  }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+  """Stages whose median grew by more than ``threshold`` (and the noise floor) since the baseline."""
+  regressions = []
+  for case, current in results.items():
+    previous = baseline.get("cases", {}).get(case)
+    if previous is None:
+      continue
+    for stage, timing in current["stages_ms"].items():
+      before = previous["stages_ms"].get(stage)
+      if before is None or before["median"] <= 0:
+        continue
+      ratio = timing["median"] / before["median"]
+      if ratio > 1 + threshold and timing["median"] - before["median"] > NOISE_FLOOR_MS:
+        regressions.append({
+            "case": case,
+            "stage": stage,
+            "baseline_ms": before["median"],
+            "current_ms": timing["median"],
+            "change": f"+{(ratio - 1) * 100:.1f}%",
+        })
+  return regressions
+
+
+def parse_args() -> argparse.Namespace:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--model-path", type=Path, default=service.ServiceConfig.model_path)
+  parser.add_argument("--backend", choices=["torch", "onnx", "ctranslate2"], default="torch")
+  parser.add_argument("--device", choices=["cpu", "cuda"], default="cpu")
+  parser.add_argument("--precisions", nargs="+", default=["float32", "int8"], help="Precisions to load in turn.")
+  parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8, 32])
+  parser.add_argument("--lengths", nargs="+", type=int, default=[8, 32, 128], help="Source lengths in tokens.")
+  parser.add_argument("--beams", nargs="+", type=int, default=[1, 4])
+  parser.add_argument("--new-tokens", type=int, default=32, help="Decode steps allowed per case.")
+  parser.add_argument("--no-repeat-ngram-size", type=int, default=3)
+  parser.add_argument("--source-language", default="en")
+  parser.add_argument("--target-language", default="fr")
+  parser.add_argument("--repeat", type=int, default=5, help="Measured rounds per case.")
+  parser.add_argument("--warmup", type=int, default=1, help="Discarded rounds per case.")
+  parser.add_argument("--intra-op-threads", type=int, help="torch intra-op threads (default: one per core).")
+  parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline file to compare against.")
+  parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline.")
+  parser.add_argument(
+      "--threshold",
+      type=float,
+      default=0.10,
+      help="Flag stages whose median is this fraction slower than the baseline (default: 0.10).",
+  )
+  parser.add_argument("--output", type=Path, help="Also write the full JSON report here.")
+  return parser.parse_args()
+
+
+def main() -> None:
+  args = parse_args()
+  logging.getLogger("m2m100_service").setLevel(logging.WARNING)
+  base_config = service.ServiceConfig(
+      model_path=args.model_path.expanduser(),
+      backend=args.backend,
+      device=args.device,
+      translation_memory=None,
+      warmup_rounds=0,
+      intra_op_threads=args.intra_op_threads,
+  )
+
+  results: Dict[str, Any] = {}
+  precisions: Dict[str, str] = {}
+  for precision in args.precisions:
+    print(f"⬆️  Loading {args.backend} model ({precision})", file=sys.stderr)
+    load_runtime(replace(base_config, precision=precision))
+    precisions[precision] = service._backend.precision
+    for beam in args.beams:
+      for batch in args.batch_sizes:
+        for length in args.lengths:
+          case = f"{precision}/beam{beam}/batch{batch}/len{length}"
+          results[case] = measure_case(batch, length, beam, args)
+          stages = results[case]["stages_ms"]
+          summary = "  ".join(f"{stage} {timing['median']:.1f}" for stage, timing in stages.items())
+          print(f"⏱️  {case:<32} {summary} ms", file=sys.stderr)
+
+  report = {
+      "timestamp": datetime.now(timezone.utc).isoformat(),
+      "host": {
+          "platform": platform.platform(),
+          "machine": platform.machine(),
+          "python": platform.python_version(),
+          "torch": service.torch.__version__,
+          "threads": service.current_thread_settings()["intra_op"],
+      },
+      "model_revision": service._model_revision,
+      "backend": args.backend,
+      "device": args.device,
+      "precisions": precisions,
+      "settings": {"new_tokens": args.new_tokens, "repeat": args.repeat, "warmup": args.warmup},
+      "cases": results,
+  }
+
+  regressions: List[Dict[str, Any]] = []
+  if args.baseline.exists():
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    if baseline.get("host") != report["host"] or baseline.get("model_revision") != report["model_revision"]:
+      print("⚠️  Baseline was recorded on a different host or model revision.", file=sys.stderr)
+    regressions = compare(results, baseline, args.threshold)
+    report["baseline"] = {"path": str(args.baseline), "timestamp": baseline.get("timestamp"), "regressions": regressions}
+    for regression in regressions:
+      print(
+          f"❌ {regression['case']} {regression['stage']}: "
+          f"{regression['baseline_ms']} → {regression['current_ms']} ms ({regression['change']})",
+          file=sys.stderr,
+      )
+    if not regressions:
+      print(f"✅ No stage slower than the baseline by more than {args.threshold:.0%}", file=sys.stderr)
+
+  if args.output:
+    args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+  if args.save_baseline:
+    args.baseline.parent.mkdir(parents=True, exist_ok=True)
+    args.baseline.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"💾 Baseline saved to {args.baseline}", file=sys.stderr)
+  if regressions and not args.save_baseline:
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+  main()
@@ -12,9 +12,14 @@ PYTHON_BIN="${LOCAX_M2M100_PYTHON:-python3}"
 LOG_DIR="${LOCAX_M2M100_LOG_DIR:-$HOME/.locax/logs}"
 LOG_FILE="$LOG_DIR/m2m100_service.log"
 PID_FILE="${LOCAX_M2M100_PID_FILE:-$HOME/.locax/m2m100_service.pid}"
+START_TIMEOUT="${LOCAX_M2M100_START_TIMEOUT:-300}"
+
+health() {
+  curl --silent --max-time 2 "http://${HOST}:${PORT}/health" 2>/dev/null || true
+}
 
 check_service() {
-  curl --silent --max-time 2 "http://${HOST}:${PORT}/health" | grep -q "\"status\":\"ready\"" >/dev/null 2>&1
+  health | grep -q "\"status\":\"ready\"" >/dev/null 2>&1
 }
 
 start_service() {
@@ -26,14 +31,38 @@ start_service() {
     --port "$PORT" \
     >>"$LOG_FILE" 2>&1 &
   echo $! > "$PID_FILE"
-  sleep 3
+}
+
+# The service binds its port right away and loads the model in the background,
+# so poll /health (loading -> warming -> ready) instead of guessing a delay.
+wait_for_service() {
+  local pid last_stage="" status stage
+  pid="$(cat "$PID_FILE")"
+  for ((elapsed = 0; elapsed < START_TIMEOUT; elapsed++)); do
+    if ! kill -0 "$pid" 2>/dev/null; then
+      return 1
+    fi
+    status="$(health)"
+    case "$status" in
+      *'"status":"ready"'*) return 0 ;;
+      *'"status":"failed"'*) echo "$status" >&2; return 1 ;;
+    esac
+    stage="$(sed -n 's/.*"stage":"\([^"]*\)".*/\1/p' <<<"$status")"
+    if [[ -n "$stage" && "$stage" != "$last_stage" ]]; then
+      echo "  ${stage}..."
+      last_stage="$stage"
+    fi
+    sleep 1
+  done
+  echo "Timed out after ${START_TIMEOUT}s waiting for the M2M100 service." >&2
+  return 1
 }
 
 if check_service; then
   echo "M2M100 service already running on ${HOST}:${PORT}."
 else
   start_service
-  if check_service; then
+  if wait_for_service; then
     echo "M2M100 service is ready. Logs: $LOG_FILE"
   else
     echo "Failed to start M2M100 service. Check $LOG_FILE for details." >&2
@@ -9,32 +9,97 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import functools
+import hashlib
+import itertools
+import json
 import logging
-from dataclasses import dataclass, asdict
+import math
+import multiprocessing
+import os
+import pickle
+import queue
+import signal
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, field, replace
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, Iterable, Literal, Optional, TypeVar
 
-import torch
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from transformers import M2M100ForConditionalGeneration
 
-try:
-  from transformers import M2M100TokenizerFast as _TokenizerClass
-except ImportError:  # pragma: no cover - fallback for older wheels
-  from transformers import M2M100Tokenizer as _TokenizerClass
-
-
-try:  # Optional dependency for 8-bit loading
-  from transformers import BitsAndBytesConfig
-except Exception:  # pragma: no cover - optional path
-  BitsAndBytesConfig = None  # type: ignore
+# torch and transformers take seconds to import, so they are bound by
+# import_inference_modules() when the model loads; --help and argument errors
+# return immediately and the port is bound before they are paid for.
+torch: Any = None
+M2M100Config: Any = None
+M2M100ForConditionalGeneration: Any = None
+BaseModelOutput: Any = None
+_TokenizerClass: Any = None
+BitsAndBytesConfig: Any = None
 
 
 LOGGER = logging.getLogger("m2m100_service")
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
+REGISTRY_PATH = Path.home() / ".locax" / "models" / "registry.json"
+
+
+def import_inference_modules() -> None:
+  global torch, M2M100Config, M2M100ForConditionalGeneration, BaseModelOutput, _TokenizerClass, BitsAndBytesConfig
+  if torch is not None:
+    return
+  import torch as torch_module
+  from transformers import M2M100Config as config_class, M2M100ForConditionalGeneration as model_class
+  from transformers.modeling_outputs import BaseModelOutput as encoder_output_class
+
+  try:
+    from transformers import M2M100TokenizerFast as tokenizer_class
+  except ImportError:  # pragma: no cover - fallback for older wheels
+    from transformers import M2M100Tokenizer as tokenizer_class
+
+  try:  # Optional dependency for 8-bit loading
+    from transformers import BitsAndBytesConfig as quantization_config_class
+  except Exception:  # pragma: no cover - optional path
+    quantization_config_class = None
+
+  M2M100Config = config_class
+  M2M100ForConditionalGeneration = model_class
+  BaseModelOutput = encoder_output_class
+  _TokenizerClass = tokenizer_class
+  BitsAndBytesConfig = quantization_config_class
+  torch = torch_module  # assigned last: it doubles as the "imported" flag
+
+T = TypeVar("T")
+K = TypeVar("K", bound=Hashable)
+
+# Target tokens allowed per source token; "default" covers unlisted languages.
+DEFAULT_LENGTH_RATIOS: Dict[str, float] = {"default": 2.0}
+DEFAULT_WARMUP_LANGUAGES = ("es", "fr", "de", "ja", "zh")
+# (max source tokens, beam size): shorter sources decode with a narrower beam, since
+# beam search buys nothing on one-word labels but costs a beam-width multiple of compute.
+DEFAULT_BEAM_TIERS = ((6, 1), (20, 2))
+# Source widths padded to with --compile, so compiled graphs are reused across requests.
+DEFAULT_LENGTH_BUCKETS = (16, 32, 64, 128, 256)
+# Representative UI label, sentence and paragraph lengths.
+WARMUP_TEXTS = (
+    "Save",
+    "Open the project settings to change the default export folder.",
+    (
+        "Your progress is saved automatically every few minutes. If the game closes unexpectedly, "
+        "you can continue from the last checkpoint by selecting Continue on the main menu. "
+        "Cloud saves are synchronized when you reconnect to the internet, and older saves "
+        "remain available from the Load Game screen for thirty days."
+    ),
+)
+
 
 @dataclass
 class ServiceConfig:
@@ -42,10 +107,41 @@ class ServiceConfig:
   model_path: Path = Path.home() / ".locax" / "models" / "m2m100_418M"
   device: Optional[str] = None
   precision: str = "auto"  # auto, float32, float16, int8
+  backend: str = "torch"  # torch, onnx, ctranslate2
+  onnx_path: Optional[Path] = None  # defaults to <model_path>/onnx
+  ctranslate2_path: Optional[Path] = None  # defaults to the registry entry, then <model_path>/ctranslate2
   beam_size: int = 4
   max_length: int = 256
   preload: bool = True
   source_language: str = "en"
+  max_queue: int = 64
+  inference_threads: int = 1
+  workers: int = 1  # >1 serves inference from a pool of model processes
+  intra_op_threads: Optional[int] = None  # torch default (one per core) when unset
+  inter_op_threads: Optional[int] = None
+  cpu_affinity: Optional[list[int]] = None  # split evenly across workers
+  max_batch_rows: int = 64
+  batch_window_ms: float = 10.0
+  max_batch_tokens: int = 4096
+  cache_entries: int = 20000
+  cache_max_bytes: int = 64 * 1024 * 1024
+  translation_memory: Optional[Path] = Path.home() / ".locax" / "translation_memory.sqlite3"
+  length_ratios: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_LENGTH_RATIOS))
+  decode_slack: int = 8
+  decoding_policy: str = "adaptive"  # see DECODING_POLICIES
+  beam_tiers: list[tuple[int, ...]] = field(default_factory=lambda: list(DEFAULT_BEAM_TIERS))
+  no_repeat_ngram_size: int = 3
+  busy_load: float = 0.75  # queue fill ratio at which bulk work starts to degrade
+  latency_slo_ms: float = 2000.0  # interactive p95 target; 0 disables degrading bulk work
+  degraded_max_length: int = 128
+  warmup_rounds: int = 1  # 0 skips warmup
+  compile: bool = False  # torch backend only: inference_mode + torch.compile
+  compile_cache_dir: Path = Path.home() / ".locax" / "compile_cache"
+  length_buckets: list[int] = field(default_factory=lambda: list(DEFAULT_LENGTH_BUCKETS))
+  warmup_languages: list[str] = field(default_factory=lambda: list(DEFAULT_WARMUP_LANGUAGES))
+
+
+Priority = Literal["interactive", "bulk"]
 
 
 class TranslatePayload(BaseModel):
@@ -55,26 +151,1128 @@ class TranslatePayload(BaseModel):
   context: str | None = Field(default=None, description="Optional context string appended to the source text")
   max_length: int | None = Field(default=None, ge=32, le=1024)
   beam_size: int | None = Field(default=None, ge=1, le=8)
+  use_cache: bool = Field(default=True, description="Set to false to bypass cached translations")
+  priority: Priority = Field(default="interactive", description="'bulk' work is degraded first under load")
+
+
+class BatchItem(BaseModel):
+  key: str = Field(..., description="Caller-defined identifier echoed back in the response")
+  source_text: str = Field(..., min_length=1)
+  source_language: str | None = Field(default=None, description="Override the batch source language for this item")
+  context: str | None = Field(default=None, description="Optional context string appended to the source text")
+
+
+class BatchTranslatePayload(BaseModel):
+  items: list[BatchItem] = Field(..., min_items=1, max_items=10000)
+  target_languages: list[str] = Field(..., min_items=1, description="Language codes supported by M2M100")
+  source_language: str | None = Field(default=None, description="Override default source language")
+  max_length: int | None = Field(default=None, ge=32, le=1024)
+  beam_size: int | None = Field(default=None, ge=1, le=8)
+  use_cache: bool = Field(default=True, description="Set to false to bypass cached translations")
+  priority: Priority = Field(default="bulk", description="'bulk' work is degraded first under load")
 
 
 class MetadataResponse(BaseModel):
   model_id: str
+  model_revision: str
+  backend: str
   device: str
   precision: str
+  requested_precision: str
   max_length: int
   beam_size: int
+  workers: int
+  threads: Dict[str, Any]
+  decoding_policy: Dict[str, Any]
+  load: Dict[str, Any]
+  cache: Dict[str, int]
+  # None with --workers: each worker adapts its own budget.
+  length_ratios: Optional[Dict[str, float]]
+  truncated_rows: int
+  translation_memory: Optional[Dict[str, int]] = None
 
 
 app = FastAPI(title="M2M100 Local Service", version="0.1.0")
 SERVICE_CONFIG = ServiceConfig()
-_model: Optional[M2M100ForConditionalGeneration] = None
+_backend: Optional[TransformersBackend | CTranslate2Backend] = None
 _tokenizer: Optional[_TokenizerClass] = None
+_model_revision = "unknown"
+_device: Optional[str] = None
+_preload_task: Optional[asyncio.Task] = None
 _runtime_lock = asyncio.Lock()
 
 
+CacheKey = tuple[str, str, str, str, int, int, int, str, str, str]
+
+
+class TranslationCache:
+  """Bounded in-memory LRU of finished translations.
+
+  Keys cover the normalized source text, context, source/target language, beam size,
+  max length and model revision, so any change to those misses. Entries are evicted
+  oldest-first once either ``max_entries`` or ``max_bytes`` (UTF-8 size of key text
+  plus translation) is exceeded. A limit of 0 disables the cache.
+  """
+
+  def __init__(self, max_entries: int, max_bytes: int) -> None:
+    self.max_entries = max(0, max_entries)
+    self.max_bytes = max(0, max_bytes)
+    self.hits = 0
+    self.misses = 0
+    self._entries: OrderedDict[CacheKey, tuple[str, int]] = OrderedDict()
+    self._bytes = 0
+    self._lock = threading.Lock()
+
+  @property
+  def enabled(self) -> bool:
+    return self.max_entries > 0 and self.max_bytes > 0
+
+  def get(self, key: CacheKey) -> Optional[str]:
+    if not self.enabled:
+      return None
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is None:
+        self.misses += 1
+        return None
+      self._entries.move_to_end(key)
+      self.hits += 1
+      return entry[0]
+
+  def put(self, key: CacheKey, translation: str) -> None:
+    if not self.enabled:
+      return
+    size = len(translation.encode("utf-8")) + sum(len(str(part).encode("utf-8")) for part in key)
+    if size > self.max_bytes:
+      return
+    with self._lock:
+      previous = self._entries.pop(key, None)
+      if previous is not None:
+        self._bytes -= previous[1]
+      self._entries[key] = (translation, size)
+      self._bytes += size
+      while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+        _, (_, evicted_size) = self._entries.popitem(last=False)
+        self._bytes -= evicted_size
+
+  def stats(self) -> Dict[str, int]:
+    with self._lock:
+      return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+class TranslationMemory:
+  """SQLite translation memory that survives service restarts.
+
+  Rows are indexed by a SHA-256 of the cache key, so a lookup is a single primary-key
+  probe. The database runs in WAL mode: lookups use their own connection and never
+  wait on writes, which are queued and committed in batches by a background thread
+  so request handlers never block on disk.
+  """
+
+  _SCHEMA = """
+      CREATE TABLE IF NOT EXISTS translations (
+          key_hash TEXT PRIMARY KEY,
+          source_text TEXT NOT NULL,
+          context TEXT NOT NULL,
+          source_language TEXT NOT NULL,
+          target_language TEXT NOT NULL,
+          beam_size INTEGER NOT NULL,
+          max_length INTEGER NOT NULL,
+          no_repeat_ngram_size INTEGER NOT NULL,
+          model_revision TEXT NOT NULL,
+          backend TEXT NOT NULL,
+          precision TEXT NOT NULL,
+          translation TEXT NOT NULL,
+          created_at REAL NOT NULL
+      ) WITHOUT ROWID
+  """
+  _WRITE_BATCH = 256
+
+  def __init__(self, path: Path) -> None:
+    self.path = path
+    self.hits = 0
+    self.misses = 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    self._reader = self._connect()
+    self._reader.execute(self._SCHEMA)
+    self._read_lock = threading.Lock()
+    self._writes: "queue.Queue[Optional[tuple[CacheKey, str]]]" = queue.Queue()
+    self._writer = threading.Thread(target=self._drain_writes, name="m2m100-memory-writer", daemon=True)
+    self._writer.start()
+
+  def _connect(self) -> sqlite3.Connection:
+    connection = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+  @staticmethod
+  def key_hash(key: CacheKey) -> str:
+    return hashlib.sha256(json.dumps(key, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+  def lookup_many(self, keys: Iterable[CacheKey]) -> Dict[CacheKey, str]:
+    by_hash = {self.key_hash(key): key for key in keys}
+    found: Dict[CacheKey, str] = {}
+    hashes = list(by_hash)
+    with self._read_lock:
+      for start in range(0, len(hashes), 500):
+        chunk = hashes[start:start + 500]
+        placeholders = ",".join("?" * len(chunk))
+        rows = self._reader.execute(
+            f"SELECT key_hash, translation FROM translations WHERE key_hash IN ({placeholders})", chunk
+        ).fetchall()
+        for key_hash, translation in rows:
+          found[by_hash[key_hash]] = translation
+      self.hits += len(found)
+      self.misses += len(by_hash) - len(found)
+    return found
+
+  def record(self, key: CacheKey, translation: str) -> None:
+    self._writes.put((key, translation))
+
+  def _drain_writes(self) -> None:
+    connection = self._connect()
+    stopping = False
+    while not stopping:
+      pending = [self._writes.get()]
+      while len(pending) < self._WRITE_BATCH:
+        try:
+          pending.append(self._writes.get_nowait())
+        except queue.Empty:
+          break
+      if None in pending:
+        stopping = True
+      rows = [(self.key_hash(item[0]), *item[0], item[1], time.time()) for item in pending if item is not None]
+      if not rows:
+        continue
+      try:
+        with connection:
+          connection.execute("BEGIN")
+          placeholders = ", ".join("?" * len(rows[0]))
+          connection.executemany(f"INSERT OR REPLACE INTO translations VALUES ({placeholders})", rows)
+      except sqlite3.Error:
+        LOGGER.exception("Failed to persist %s translations to %s", len(rows), self.path)
+    connection.close()
+
+  def stats(self) -> Dict[str, int]:
+    with self._read_lock:
+      (entries,) = self._reader.execute("SELECT COUNT(*) FROM translations").fetchone()
+      return {"entries": entries, "hits": self.hits, "misses": self.misses, "pending_writes": self._writes.qsize()}
+
+  def close(self) -> None:
+    self._writes.put(None)
+    self._writer.join(timeout=5)
+    with self._read_lock:
+      self._reader.close()
+
+
+def normalize_text(text: str) -> str:
+  return unicodedata.normalize("NFC", text).strip()
+
+
+def build_prompt(source_text: str, context: Optional[str]) -> str:
+  text = normalize_text(source_text)
+  if context:
+    text = f"{normalize_text(context)}\n{text}"
+  return text
+
+
+def cache_key(
+    source_text: str,
+    context: Optional[str],
+    source_language: str,
+    target_language: str,
+    beam_size: int,
+    max_length: int,
+    no_repeat_ngram_size: int,
+) -> CacheKey:
+  return (
+      normalize_text(source_text),
+      normalize_text(context or ""),
+      source_language,
+      target_language,
+      beam_size,
+      max_length,
+      no_repeat_ngram_size,
+      _model_revision,
+      # int8, float16, ONNX and CTranslate2 outputs differ from float32 torch.
+      SERVICE_CONFIG.backend,
+      runtime_precision(),
+  )
+
+
+def load_model_revision(model_path: Path) -> str:
+  """Identify the loaded weights from ``manifest-lock.json`` written by ``fetch.py``."""
+  manifest_path = model_path / "manifest-lock.json"
+  try:
+    with manifest_path.open("r", encoding="utf-8") as handle:
+      manifest = json.load(handle)
+  except (OSError, json.JSONDecodeError):
+    LOGGER.warning("No readable %s; cached translations are keyed to an unknown revision.", manifest_path)
+    return "unknown"
+  digest = hashlib.sha256()
+  for artifact in manifest.get("artifacts", []):
+    digest.update(f"{artifact.get('path')}:{artifact.get('sha256')}".encode("utf-8"))
+  return f"{manifest.get('revision', 'unknown')}@{digest.hexdigest()[:12]}"
+
+
+class DecodeBudget:
+  """Caps decoder steps from the source length instead of always running to ``max_length``.
+
+  ``max_new_tokens = ceil(source_tokens * ratio(lang)) + slack``, never above the
+  request's ``max_length`` ceiling. Ratios start from the configured table and are
+  raised (never lowered) by an exponential moving average of the output/input ratio
+  observed on rows that finished with EOS, times ``headroom``.
+  """
+
+  def __init__(self, ratios: Dict[str, float], slack: int, headroom: float = 1.5, smoothing: float = 0.05) -> None:
+    self.configured = dict(ratios)
+    self.default_ratio = self.configured.pop("default", DEFAULT_LENGTH_RATIOS["default"])
+    self.slack = max(0, slack)
+    self.headroom = headroom
+    self.smoothing = smoothing
+    self._observed: Dict[str, float] = {}
+    self._lock = threading.Lock()
+
+  def ratio(self, lang: str) -> float:
+    configured = self.configured.get(lang, self.default_ratio)
+    observed = self._observed.get(lang)
+    return configured if observed is None else max(configured, observed * self.headroom)
+
+  def max_new_tokens(self, source_tokens: int, lang: str, ceiling: int) -> int:
+    return max(1, min(ceiling, math.ceil(source_tokens * self.ratio(lang)) + self.slack))
+
+  def observe(self, lang: str, source_tokens: int, output_tokens: int, finished: bool) -> None:
+    with self._lock:
+      if not finished:
+        return
+      sample = output_tokens / max(1, source_tokens)
+      previous = self._observed.get(lang)
+      self._observed[lang] = sample if previous is None else previous + self.smoothing * (sample - previous)
+
+  def snapshot(self) -> Dict[str, float]:
+    with self._lock:
+      langs = {*self.configured, *self._observed}
+    ratios = {lang: round(self.ratio(lang), 3) for lang in sorted(langs)}
+    ratios["default"] = self.default_ratio
+    return ratios
+
+
+def load_length_ratios(path: Path) -> Dict[str, float]:
+  with path.open("r", encoding="utf-8") as handle:
+    data = json.load(handle)
+  if not isinstance(data, dict) or not all(isinstance(value, (int, float)) for value in data.values()):
+    raise SystemExit(f"{path} must map language codes (or \"default\") to numeric ratios.")
+  return {**DEFAULT_LENGTH_RATIOS, **{lang: float(value) for lang, value in data.items()}}
+
+
+@dataclass(frozen=True)
+class DecodeChoice:
+  policy: str
+  beam_size: int
+  no_repeat_ngram_size: int
+  source_tokens: int
+  degradation: int = 0
+
+
+class FixedDecodingPolicy:
+  """Decodes every request with the requested (or configured) beam size."""
+
+  name = "fixed"
+
+  def __init__(self, config: ServiceConfig) -> None:
+    self.no_repeat_ngram_size = config.no_repeat_ngram_size
+
+  def choose(self, source_tokens: int, beam_size: int) -> DecodeChoice:
+    return DecodeChoice(self.name, beam_size, self.no_repeat_ngram_size, source_tokens)
+
+
+class AdaptiveDecodingPolicy(FixedDecodingPolicy):
+  """Picks the beam width from the source length.
+
+  ``beam_tiers`` entries are ``(max_source_tokens, beam_size[, no_repeat_ngram_size])``.
+  A source no longer than a tier's limit decodes with that tier's beam (never wider
+  than requested) and, if given, its no-repeat n-gram size; longer sources keep the
+  requested beam. Narrowing beams under load is left to ``LoadGovernor``.
+  """
+
+  name = "adaptive"
+
+  def __init__(self, config: ServiceConfig) -> None:
+    super().__init__(config)
+    self.tiers = sorted(config.beam_tiers)
+
+  def choose(self, source_tokens: int, beam_size: int) -> DecodeChoice:
+    beam, no_repeat = beam_size, self.no_repeat_ngram_size
+    for limit, tier_beam, *tier_no_repeat in self.tiers:
+      if source_tokens <= limit:
+        beam = min(tier_beam, beam_size)
+        no_repeat = tier_no_repeat[0] if tier_no_repeat else no_repeat
+        break
+    return DecodeChoice(self.name, beam, no_repeat, source_tokens)
+
+
+DECODING_POLICIES: Dict[str, type[FixedDecodingPolicy]] = {
+    FixedDecodingPolicy.name: FixedDecodingPolicy,
+    AdaptiveDecodingPolicy.name: AdaptiveDecodingPolicy,
+}
+
+
+class LoadGovernor:
+  """Degrades bulk work while the interactive latency SLO is at risk.
+
+  The level rises one step when the p95 of recent interactive request latencies
+  exceeds ``slo_ms`` or the inference queue is more than ``high_water`` full. It falls
+  one step once p95 is back under half the SLO and the queue under half of
+  ``high_water``. Only samples from the last ``max_age_s`` count, so an idle service
+  steps back down after a slow burst instead of keeping its p95 forever. Changes are
+  at most one step per ``cooldown_s``, so the level does not flap. Bulk requests
+  decode with half the beam at level 1 and greedily at level 2. Level 3 also caps
+  their ``max_length`` (and so the decode budget) at ``degraded_max_length``.
+  This is the only load-based reduction; interactive requests always get full quality.
+  """
+
+  max_level = 3
+
+  def __init__(
+      self,
+      slo_ms: float,
+      degraded_max_length: int,
+      high_water: float = 0.5,
+      cooldown_s: float = 2.0,
+      window: int = 64,
+      max_age_s: float = 30.0,
+  ) -> None:
+    self.slo = slo_ms / 1000.0
+    self.degraded_max_length = degraded_max_length
+    self.high_water = high_water
+    self.cooldown = cooldown_s
+    self.level = 0
+    self.max_age = max_age_s
+    # (monotonic time, seconds)
+    self._latencies: deque[tuple[float, float]] = deque(maxlen=window)
+    self._changed_at = 0.0
+
+  @property
+  def enabled(self) -> bool:
+    return self.slo > 0
+
+  def p95(self) -> Optional[float]:
+    horizon = time.monotonic() - self.max_age
+    while self._latencies and self._latencies[0][0] < horizon:
+      self._latencies.popleft()
+    if not self._latencies:
+      return None
+    ordered = sorted(seconds for _, seconds in self._latencies)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+  def observe(self, seconds: float) -> None:
+    self._latencies.append((time.monotonic(), seconds))
+
+  def update(self, queue_fill: float) -> int:
+    if not self.enabled:
+      return 0
+    now = time.monotonic()
+    if now - self._changed_at < self.cooldown:
+      return self.level
+    p95 = self.p95() or 0.0
+    if (p95 > self.slo or queue_fill > self.high_water) and self.level < self.max_level:
+      self.level += 1
+    elif p95 < self.slo / 2 and queue_fill < self.high_water / 2 and self.level > 0:
+      self.level -= 1
+      # Old slow samples would otherwise keep p95 high after the backlog clears.
+      self._latencies.clear()
+    else:
+      return self.level
+    self._changed_at = now
+    LOGGER.info("Load level %s (p95 %.0f ms, queue %.0f%% full)", self.level, p95 * 1000, queue_fill * 100)
+    return self.level
+
+  def degrade(self, decoding: DecodeChoice, max_length: int, level: int) -> tuple[DecodeChoice, int]:
+    if level == 0:
+      return decoding, max_length
+    beam = max(1, decoding.beam_size // 2) if level == 1 else 1
+    if level >= 3:
+      max_length = min(max_length, self.degraded_max_length)
+    return replace(decoding, beam_size=beam, degradation=level), max_length
+
+  def snapshot(self) -> Dict[str, Any]:
+    p95 = self.p95()
+    return {
+        "degradation_level": self.level,
+        "interactive_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        "slo_ms": round(self.slo * 1000, 1),
+        "busy_load": self.high_water,
+    }
+
+
+# name: (type, help, histogram buckets)
+METRICS: Dict[str, tuple[str, str, tuple[float, ...]]] = {
+    "m2m100_stage_seconds": (
+        "histogram",
+        "Time spent per inference stage: queue wait, tokenize, generate and decode.",
+        (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+    ),
+    "m2m100_batch_rows": (
+        "histogram",
+        "Decoder rows (sources x target languages) per generate call.",
+        (1, 2, 4, 8, 16, 32, 64, 128),
+    ),
+    "m2m100_input_tokens_total": ("counter", "Source tokens encoded.", ()),
+    "m2m100_output_tokens_total": ("counter", "Target tokens generated.", ()),
+    "m2m100_translations_total": ("counter", "Translations served per language pair and origin.", ()),
+    "m2m100_truncated_rows_total": ("counter", "Rows cut off by the decode budget before EOS, per target language.", ()),
+}
+THROUGHPUT_WINDOW_S = 60.0
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def format_labels(labels: Labels) -> str:
+  if not labels:
+    return ""
+  escaped = (
+      '{}="{}"'.format(name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+      for name, value in labels
+  )
+  return "{" + ",".join(escaped) + "}"
+
+
+class ServiceMetrics:
+  """Counters and histograms exposed by ``/metrics`` in the Prometheus text format.
+
+  Inference code records into the module-level ``_metrics`` from any thread. Inside a
+  ``WorkerPool`` process the instance is created with ``forward=True``: events are
+  buffered instead of aggregated, and the worker ships them to the front process,
+  which ``replay``s them, so ``/metrics`` covers every worker.
+  """
+
+  def __init__(self, forward: bool = False) -> None:
+    self.forward = forward
+    self._lock = threading.Lock()
+    self._events: list[tuple[str, str, float, Labels]] = []
+    self.reset()
+
+  def reset(self) -> None:
+    with self._lock:
+      self._counters: Dict[tuple[str, Labels], float] = {}
+      self._histograms: Dict[tuple[str, Labels], list[float]] = {}  # bucket counts, then sum
+      self._tokens: deque[tuple[float, int, int]] = deque()
+
+  def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+    self._record("inc", name, value, tuple(sorted(labels.items())))
+
+  def observe(self, name: str, value: float, **labels: str) -> None:
+    self._record("observe", name, value, tuple(sorted(labels.items())))
+
+  def stage(self, stage: str, seconds: float) -> None:
+    self.observe("m2m100_stage_seconds", seconds, stage=stage)
+
+  def take_events(self) -> list[tuple[str, str, float, Labels]]:
+    with self._lock:
+      events, self._events = self._events, []
+    return events
+
+  def replay(self, events: Iterable[tuple[str, str, float, Labels]]) -> None:
+    for event in events:
+      self._record(*event)
+
+  def _record(self, kind: str, name: str, value: float, labels: Labels) -> None:
+    with self._lock:
+      if self.forward:
+        self._events.append((kind, name, value, labels))
+        return
+      if kind == "inc":
+        self._counters[(name, labels)] = self._counters.get((name, labels), 0.0) + value
+        if name in {"m2m100_input_tokens_total", "m2m100_output_tokens_total"}:
+          produced = name == "m2m100_output_tokens_total"
+          self._tokens.append((time.monotonic(), 0 if produced else int(value), int(value) if produced else 0))
+        return
+      buckets = METRICS[name][2]
+      counts = self._histograms.setdefault((name, labels), [0.0] * (len(buckets) + 2))
+      for index, bound in enumerate(buckets):
+        if value <= bound:
+          counts[index] += 1
+      counts[-2] += 1  # +Inf
+      counts[-1] += value
+
+  def total(self, name: str) -> float:
+    """A counter summed over all of its label sets."""
+    with self._lock:
+      return sum(value for (metric, _), value in self._counters.items() if metric == name)
+
+  def tokens_per_second(self) -> tuple[float, float]:
+    """Input and output token rates over the last ``THROUGHPUT_WINDOW_S`` seconds."""
+    cutoff = time.monotonic() - THROUGHPUT_WINDOW_S
+    with self._lock:
+      while self._tokens and self._tokens[0][0] < cutoff:
+        self._tokens.popleft()
+      consumed = sum(entry[1] for entry in self._tokens)
+      produced = sum(entry[2] for entry in self._tokens)
+    return consumed / THROUGHPUT_WINDOW_S, produced / THROUGHPUT_WINDOW_S
+
+  def render(self, gauges: Dict[str, tuple[str, float]]) -> str:
+    """Text exposition of every series, followed by ``gauges`` (name: (help, value))."""
+    with self._lock:
+      counters = dict(self._counters)
+      histograms = {key: list(counts) for key, counts in self._histograms.items()}
+    lines: list[str] = []
+    for name, (kind, description, buckets) in METRICS.items():
+      lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+      if kind == "counter":
+        series = sorted((labels, value) for (metric, labels), value in counters.items() if metric == name)
+        if not series:
+          lines.append(f"{name} 0")
+        lines += [f"{name}{format_labels(labels)} {value:g}" for labels, value in series]
+        continue
+      for (metric, labels), counts in sorted(histograms.items()):
+        if metric != name:
+          continue
+        for bound, count in zip([*buckets, "+Inf"], counts):
+          bucket_labels = format_labels((*labels, ("le", str(bound))))
+          lines.append(f"{name}_bucket{bucket_labels} {count:g}")
+        lines.append(f"{name}_sum{format_labels(labels)} {counts[-1]:.6f}")
+        lines.append(f"{name}_count{format_labels(labels)} {counts[-2]:g}")
+    for name, (description, value) in gauges.items():
+      lines += [f"# HELP {name} {description}", f"# TYPE {name} gauge", f"{name} {value:g}"]
+    return "\n".join(lines) + "\n"
+
+
+class InferenceQueue:
+  """Runs blocking model calls on dedicated threads behind a bounded queue.
+
+  Concurrency rule: at most ``threads`` calls touch ``_backend`` at a time, and every
+  inference call must go through ``run``. Inference code only reads shared
+  model/tokenizer state (source-language prefixes are built per request by
+  ``encode_sources``), so several ``generate`` calls may safely overlap; the
+  default of one thread keeps the whole intra-op thread pool for a single call.
+  ``count_tokens`` is read-only and cheap, so it may also run on the event loop.
+  Control endpoints never enter the queue, so they keep answering while generation
+  is in flight. Requests beyond ``max_pending`` (running plus waiting) are rejected
+  with HTTP 503 instead of piling up on the event loop.
+  """
+
+  def __init__(self, max_pending: int, threads: int = 1) -> None:
+    self.max_pending = max(1, max_pending)
+    self.threads = max(1, threads)
+    self._pending = 0
+    self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="m2m100-inference")
+
+  @property
+  def depth(self) -> int:
+    return self._pending
+
+  @property
+  def parallelism(self) -> int:
+    """Calls that can run at the same time."""
+    return self.threads
+
+  async def run(self, func: Callable[..., T], *args: Any, progress: Optional[Callable[[Any], None]] = None) -> T:
+    """Run ``func`` on an inference thread; ``progress`` receives its ``report_progress`` calls on the loop."""
+    # Only touched from the event loop thread, so the counter needs no lock.
+    if self._pending >= self.max_pending:
+      raise HTTPException(status_code=503, detail="Inference queue is full; retry shortly.")
+    self._pending += 1
+    try:
+      loop = asyncio.get_running_loop()
+      report = functools.partial(loop.call_soon_threadsafe, progress) if progress is not None else None
+      return await loop.run_in_executor(self._executor, _timed_job, time.time(), func, args, report)
+    finally:
+      self._pending -= 1
+
+  def shutdown(self) -> None:
+    self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def intra_op_threads(config: ServiceConfig) -> Optional[int]:
+  """Explicit intra-op thread count, defaulting to one per pinned core."""
+  if config.intra_op_threads:
+    return config.intra_op_threads
+  return len(config.cpu_affinity) if config.cpu_affinity else None
+
+
+def apply_thread_settings(config: ServiceConfig) -> None:
+  """Pin cores and size torch's thread pools; must run before the model loads."""
+  if config.cpu_affinity:
+    if hasattr(os, "sched_setaffinity"):
+      try:
+        os.sched_setaffinity(0, config.cpu_affinity)
+      except OSError as exc:
+        raise RuntimeError(f"Cannot pin to cores {config.cpu_affinity}: {exc}") from exc
+    else:
+      LOGGER.warning("CPU affinity is not supported on this platform; ignoring --cpu-affinity.")
+  threads = intra_op_threads(config)
+  if threads:
+    torch.set_num_threads(threads)
+  if config.inter_op_threads:
+    try:
+      torch.set_num_interop_threads(config.inter_op_threads)
+    except RuntimeError:
+      # torch fixes the inter-op pool on first parallel work.
+      LOGGER.warning("Inter-op thread pool already started; keeping %s threads.", torch.get_num_interop_threads())
+
+
+def current_thread_settings() -> Dict[str, Any]:
+  if torch is None:  # not loaded yet; report what will be applied
+    return {
+        "intra_op": intra_op_threads(SERVICE_CONFIG),
+        "inter_op": SERVICE_CONFIG.inter_op_threads,
+        "cpu_affinity": SERVICE_CONFIG.cpu_affinity,
+    }
+  return {
+      "intra_op": torch.get_num_threads(),
+      "inter_op": torch.get_num_interop_threads(),
+      "cpu_affinity": sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None,
+  }
+
+
+def worker_configs(config: ServiceConfig) -> list[ServiceConfig]:
+  """Give each worker an equal share of the pinned (or all) cores as its thread budget."""
+  workers = config.workers
+  cores = config.cpu_affinity or []
+  share = len(cores) // workers
+  threads = config.intra_op_threads or max(1, (len(cores) or os.cpu_count() or 1) // workers)
+  return [
+      replace(
+          config,
+          workers=1,
+          warmup_rounds=0,  # the front process warms every worker
+          intra_op_threads=threads,
+          cpu_affinity=(cores[index * share:(index + 1) * share] if share else cores) or None,
+      )
+      for index in range(workers)
+  ]
+
+
+class WorkerPool:
+  """Runs model calls in ``workers`` processes, with the same interface as ``InferenceQueue``.
+
+  Workers are spawned (not forked, which is unsafe once torch has started its thread
+  pools) and each loads the model itself. Safetensors weights are memory-mapped, so N
+  workers share one copy in the page cache instead of N private ones. Each worker
+  runs one call at a time within its share of the thread budget (see
+  ``worker_configs``), and ``run`` dispatches to
+  the worker with the fewest outstanding calls. ``func`` and its arguments must be
+  picklable module-level callables. The tokenizer, caches and translation memory stay
+  in the front process; each worker adapts its own ``DecodeBudget``.
+  """
+
+  def __init__(self, config: ServiceConfig, max_pending: int) -> None:
+    self.configs = worker_configs(config)
+    self.max_pending = max(1, max_pending)
+    self.workers = len(self.configs)
+    self.precision = "not-loaded"
+    self.ready = False
+    self._pending = 0
+    self._outstanding = [0] * self.workers
+    self._jobs: Dict[int, tuple[int, asyncio.Future, Optional[Callable[[Any], None]]]] = {}
+    self._job_ids = itertools.count()
+    self._booting: Dict[int, asyncio.Future] = {}
+    self._dead: set[int] = set()
+    self._processes: list[multiprocessing.process.BaseProcess] = []
+    self._inboxes: list[Any] = []
+    self._results: Any = None
+    self._listener: Optional[threading.Thread] = None
+    self._loop: Optional[asyncio.AbstractEventLoop] = None
+    self._closed = threading.Event()
+
+  @property
+  def depth(self) -> int:
+    return self._pending
+
+  @property
+  def parallelism(self) -> int:
+    return self.workers
+
+  async def start(self) -> None:
+    """Spawn the workers and wait until every one has loaded the model.
+
+    If any worker fails to load, all of them are stopped before the error propagates,
+    so a retried start begins from an empty pool.
+    """
+    self._loop = asyncio.get_running_loop()
+    self._closed.clear()
+    self._outstanding = [0] * self.workers
+    self._jobs = {}
+    self._booting = {}
+    self._dead = set()
+    context = multiprocessing.get_context("spawn")
+    self._results = context.Queue()
+    for index in range(self.workers):
+      inbox = context.Queue()
+      process = context.Process(
+          target=_worker_main,
+          args=(self.configs[index], index, inbox, self._results),
+          name=f"m2m100-worker-{index}",
+          daemon=True,
+      )
+      self._booting[index] = self._loop.create_future()
+      process.start()
+      self._inboxes.append(inbox)
+      self._processes.append(process)
+    self._listener = threading.Thread(target=self._listen, name="m2m100-worker-results", daemon=True)
+    self._listener.start()
+    LOGGER.info("Started %s inference workers with %s threads each", self.workers, self.configs[0].intra_op_threads)
+    try:
+      precisions = await asyncio.gather(*self._booting.values())
+    except BaseException:
+      await asyncio.to_thread(self._stop_workers, False)
+      raise
+    self.precision = precisions[0]
+    self.ready = True
+
+  async def run(self, func: Callable[..., T], *args: Any, progress: Optional[Callable[[Any], None]] = None) -> T:
+    if not self.ready:
+      raise RuntimeError("Model not loaded")
+    if self._pending >= self.max_pending:
+      raise HTTPException(status_code=503, detail="Inference queue is full; retry shortly.")
+    live = [index for index in range(self.workers) if index not in self._dead]
+    if not live:
+      raise HTTPException(status_code=503, detail="No inference workers are running.")
+    worker = min(live, key=self._outstanding.__getitem__)
+    job_id = next(self._job_ids)
+    future = self._loop.create_future()
+    self._jobs[job_id] = (worker, future, progress)
+    self._outstanding[worker] += 1
+    self._pending += 1
+    try:
+      self._inboxes[worker].put((job_id, time.time(), func, args, progress is not None))
+      return await future
+    finally:
+      self._pending -= 1
+
+  def _listen(self) -> None:
+    reported: set[int] = set()
+    while not self._closed.is_set():
+      try:
+        message = self._results.get(timeout=1.0)
+      except queue.Empty:
+        for index, process in enumerate(self._processes):
+          if index not in reported and not process.is_alive():
+            reported.add(index)
+            self._loop.call_soon_threadsafe(self._fail_worker, index, process.exitcode)
+        continue
+      except (EOFError, OSError):
+        return
+      self._loop.call_soon_threadsafe(self._settle, *message)
+
+  def _settle(self, kind: str, worker: int, job_id: Optional[int], payload: Any) -> None:
+    if kind == "metrics":
+      _metrics.replay(payload)
+      return
+    if kind == "progress":
+      entry = self._jobs.get(job_id)
+      if entry is not None and entry[2] is not None:
+        entry[2](payload)
+      return
+    if kind in {"ready", "failed"}:
+      booting = self._booting[worker]
+      if not booting.done():
+        if kind == "ready":
+          booting.set_result(payload)
+        else:
+          booting.set_exception(RuntimeError(f"Inference worker {worker} failed to load: {payload}"))
+      return
+    entry = self._jobs.pop(job_id, None)
+    if entry is None:
+      return
+    _, future, _ = entry
+    self._outstanding[worker] -= 1
+    if future.done():
+      return
+    if kind == "error":
+      status_code, error = payload
+      future.set_exception(HTTPException(status_code=status_code, detail=error) if status_code else error)
+    else:
+      future.set_result(payload)
+
+  def _fail_worker(self, worker: int, exitcode: Optional[int]) -> None:
+    self._dead.add(worker)
+    if not self._closed.is_set():
+      LOGGER.error("Inference worker %s exited with code %s", worker, exitcode)
+    error = RuntimeError(f"Inference worker {worker} exited with code {exitcode}")
+    self._settle("failed", worker, None, error)
+    for job_id, (owner, _, _) in list(self._jobs.items()):
+      if owner == worker:
+        self._settle("error", worker, job_id, (None, error))
+
+  def thread_settings(self) -> Dict[str, Any]:
+    return {
+        "intra_op": self.configs[0].intra_op_threads,
+        "inter_op": self.configs[0].inter_op_threads,
+        "cpu_affinity": [worker.cpu_affinity for worker in self.configs] if self.configs[0].cpu_affinity else None,
+    }
+
+  def _stop_workers(self, graceful: bool = True) -> None:
+    """Stop the worker processes and the results listener, then drop them from the pool."""
+    self._closed.set()
+    for inbox in self._inboxes:
+      if graceful:
+        inbox.put(None)
+    for process in self._processes:
+      if graceful:
+        process.join(timeout=5)
+      if process.is_alive():
+        process.terminate()
+        process.join(timeout=5)
+    if self._listener is not None:
+      self._listener.join(timeout=5)
+    for channel in [*self._inboxes, self._results]:
+      if channel is not None:
+        channel.close()
+    self._processes = []
+    self._inboxes = []
+    self._results = None
+    self._listener = None
+
+  def shutdown(self) -> None:
+    self._stop_workers()
+
+
+_job_progress = threading.local()
+
+
+def report_progress(payload: Any) -> None:
+  """Hand ``payload`` to the ``progress`` callback of the running inference call, if any.
+
+  Must be called on the thread running the call; the callback itself runs on the
+  front process's event loop. Payloads cross processes with ``--workers``, so they
+  must be picklable.
+  """
+  report = getattr(_job_progress, "report", None)
+  if report is not None:
+    report(payload)
+
+
+def wants_progress() -> bool:
+  return getattr(_job_progress, "report", None) is not None
+
+
+def _timed_job(
+    enqueued: float,
+    func: Callable[..., T],
+    args: tuple[Any, ...],
+    report: Optional[Callable[[Any], None]] = None,
+) -> T:
+  """Record how long a call waited for a free inference slot, then run it."""
+  # Wall-clock time, so the wait is comparable across processes.
+  _metrics.stage("queue", time.time() - enqueued)
+  _job_progress.report = report
+  try:
+    return func(*args)
+  finally:
+    _job_progress.report = None
+
+
+def _portable_error(exc: Exception) -> tuple[Optional[int], Any]:
+  """Encode a worker exception so the front process can unpickle and re-raise it."""
+  if isinstance(exc, HTTPException):
+    return exc.status_code, exc.detail
+  try:
+    pickle.loads(pickle.dumps(exc))
+  except Exception:
+    return None, RuntimeError(f"{type(exc).__name__}: {exc}")
+  return None, exc
+
+
+def _forward_progress(results: Any, index: int, job_id: int, payload: Any) -> None:
+  results.put(("progress", index, job_id, payload))
+
+
+def _worker_main(config: ServiceConfig, index: int, inbox: Any, results: Any) -> None:
+  """Entry point of a ``WorkerPool`` process: load the model, then serve calls until ``None``."""
+  global SERVICE_CONFIG, _decode_budget, _metrics
+  # Ctrl+C reaches the whole process group; the front process stops workers itself.
+  signal.signal(signal.SIGINT, signal.SIG_IGN)
+  SERVICE_CONFIG = config
+  _decode_budget = DecodeBudget(config.length_ratios, config.decode_slack)
+  _metrics = ServiceMetrics(forward=True)
+  try:
+    asyncio.run(ensure_runtime_loaded())
+  except Exception as exc:
+    results.put(("failed", index, None, f"{type(exc).__name__}: {exc}"))
+    return
+  results.put(("ready", index, None, _backend.precision))
+  for job_id, enqueued, func, args, progress in iter(inbox.get, None):
+    report = functools.partial(_forward_progress, results, index, job_id) if progress else None
+    try:
+      result = _timed_job(enqueued, func, args, report)
+    except Exception as exc:
+      results.put(("metrics", index, None, _metrics.take_events()))
+      results.put(("error", index, job_id, _portable_error(exc)))
+    else:
+      results.put(("metrics", index, None, _metrics.take_events()))
+      results.put(("result", index, job_id, result))
+
+
+@dataclass
+class _PendingTranslation:
+  text: str
+  source_language: str
+  target_languages: list[str]
+  future: asyncio.Future
+  on_row: Optional[Callable[..., None]] = None
+
+
+@dataclass
+class _PendingGroup:
+  requests: list[_PendingTranslation]
+  tokens: int = 0
+  timer: Optional[asyncio.TimerHandle] = None
+
+
+class MicroBatcher:
+  """Coalesces concurrent ``/translate`` calls into shared ``generate_batch`` calls.
+
+  Requests with identical decode parameters (max_length, beam size, no-repeat n-gram
+  size) that arrive within ``window_ms`` of the first one in their group run as one batch.
+  Source languages may differ within a batch because ``encode_sources`` prefixes each
+  row with its own language token. A group is flushed early when its token budget
+  (source tokens x target languages) would exceed ``max_batch_tokens``. A window of 0
+  disables coalescing. ``on_row`` is called with ``(lang, translation, usage,
+  generate_seconds)`` for each row that finishes before the batch returns.
+  """
+
+  def __init__(self, queue: InferenceQueue | WorkerPool, window_ms: float, max_batch_tokens: int) -> None:
+    self.queue = queue
+    self.window = max(0.0, window_ms) / 1000.0
+    self.max_batch_tokens = max(1, max_batch_tokens)
+    self._groups: Dict[tuple[int, int, int], _PendingGroup] = {}
+
+  async def submit(
+      self,
+      text: str,
+      target_languages: list[str],
+      source_language: str,
+      max_length: int,
+      beam_size: int,
+      no_repeat_ngram_size: int,
+      on_row: Optional[Callable[..., None]] = None,
+  ) -> TranslationOutput:
+    key = (max_length, beam_size, no_repeat_ngram_size)
+    loop = asyncio.get_running_loop()
+    request = _PendingTranslation(text, source_language, target_languages, loop.create_future(), on_row)
+    if self.window == 0:
+      await self._run(key, [request])
+      return request.future.result()
+
+    tokens = (count_tokens([text])[0] + 2) * len(target_languages)
+    group = self._groups.get(key)
+    if group is not None and group.tokens + tokens > self.max_batch_tokens:
+      self._flush(key)
+
+    group = self._groups.setdefault(key, _PendingGroup(requests=[]))
+    group.requests.append(request)
+    group.tokens += tokens
+    if group.tokens >= self.max_batch_tokens:
+      self._flush(key)
+    elif group.timer is None:
+      group.timer = loop.call_later(self.window, self._flush, key)
+    return await request.future
+
+  def _flush(self, key: tuple[int, int, int]) -> None:
+    group = self._groups.pop(key, None)
+    if group is None:
+      return
+    if group.timer is not None:
+      group.timer.cancel()
+    asyncio.ensure_future(self._run(key, group.requests))
+
+  async def _run(self, key: tuple[int, int, int], requests: list[_PendingTranslation]) -> None:
+    max_length, beam_size, no_repeat_ngram_size = key
+    wants_rows = any(request.on_row is not None for request in requests)
+    try:
+      results = await self.queue.run(
+          generate_batch_with_usage,
+          [request.text for request in requests],
+          [request.source_language for request in requests],
+          [request.target_languages for request in requests],
+          max_length,
+          beam_size,
+          no_repeat_ngram_size,
+          progress=functools.partial(self._deliver_row, requests) if wants_rows else None,
+      )
+    except Exception as exc:  # Propagate to every caller that shared the batch.
+      for request in requests:
+        if not request.future.done():
+          request.future.set_exception(exc)
+      return
+    for request, output in zip(requests, results):
+      if not request.future.done():
+        request.future.set_result(output)
+
+  @staticmethod
+  def _deliver_row(requests: list[_PendingTranslation], row: tuple[Any, ...]) -> None:
+    source, *result = row
+    request = requests[source]
+    if request.on_row is not None and not request.future.done():
+      request.on_row(*result)
+
+
+_inference_queue: InferenceQueue | WorkerPool = InferenceQueue(SERVICE_CONFIG.max_queue, SERVICE_CONFIG.inference_threads)
+_batcher = MicroBatcher(_inference_queue, SERVICE_CONFIG.batch_window_ms, SERVICE_CONFIG.max_batch_tokens)
+_cache = TranslationCache(SERVICE_CONFIG.cache_entries, SERVICE_CONFIG.cache_max_bytes)
+_memory: Optional[TranslationMemory] = None
+_decode_budget = DecodeBudget(SERVICE_CONFIG.length_ratios, SERVICE_CONFIG.decode_slack)
+_decoding_policy: FixedDecodingPolicy = DECODING_POLICIES[SERVICE_CONFIG.decoding_policy](SERVICE_CONFIG)
+_governor = LoadGovernor(SERVICE_CONFIG.latency_slo_ms, SERVICE_CONFIG.degraded_max_length, SERVICE_CONFIG.busy_load)
+_metrics = ServiceMetrics()
+
+
+async def lookup_translations(keys: Dict[K, CacheKey]) -> Dict[K, str]:
+  """Resolve keys from the in-memory LRU, then the on-disk translation memory.
+
+  Hashing and querying a large batch of keys takes long enough to stall ``/health``,
+  so the memory lookup runs on a helper thread.
+  """
+  found: Dict[K, str] = {}
+  misses: Dict[CacheKey, list[K]] = {}
+  for handle, key in keys.items():
+    cached = _cache.get(key)
+    if cached is not None:
+      found[handle] = cached
+      _metrics.inc("m2m100_translations_total", source=key[2], target=key[3], origin="cache")
+    else:
+      misses.setdefault(key, []).append(handle)
+  if misses and _memory is not None:
+    remembered = await asyncio.to_thread(_memory.lookup_many, list(misses))
+    for key, translation in remembered.items():
+      _cache.put(key, translation)
+      for handle in misses[key]:
+        found[handle] = translation
+        _metrics.inc("m2m100_translations_total", source=key[2], target=key[3], origin="memory")
+  return found
+
+
+def store_translation(key: CacheKey, translation: str) -> None:
+  _cache.put(key, translation)
+  if _memory is not None:
+    _memory.record(key, translation)
+
+
+def store_output(key: CacheKey, output: TranslationOutput, lang: str) -> None:
+  """Cache a generated row, unless the decode budget truncated it.
+
+  The budget is not part of the key and its ratios adapt over time, so a truncated
+  row would otherwise be served in place of a complete translation indefinitely.
+  """
+  if output.finished[lang]:
+    store_translation(key, output.translations[lang])
+
+
 def configure_service(config: ServiceConfig) -> None:
-  global SERVICE_CONFIG
+  global SERVICE_CONFIG, _inference_queue, _batcher, _cache, _decode_budget, _decoding_policy, _governor
   SERVICE_CONFIG = config
+  _inference_queue.shutdown()
+  if config.workers > 1:
+    _inference_queue = WorkerPool(config, config.max_queue)
+  else:
+    _inference_queue = InferenceQueue(config.max_queue, config.inference_threads)
+  _batcher = MicroBatcher(_inference_queue, config.batch_window_ms, config.max_batch_tokens)
+  _cache = TranslationCache(config.cache_entries, config.cache_max_bytes)
+  _decode_budget = DecodeBudget(config.length_ratios, config.decode_slack)
+  _decoding_policy = DECODING_POLICIES[config.decoding_policy](config)
+  _governor = LoadGovernor(config.latency_slo_ms, config.degraded_max_length, config.busy_load)
   LOGGER.info("Runtime configured: %s", SERVICE_CONFIG)
 
 
@@ -95,8 +1293,8 @@ def resolve_dtype(precision: str, device: str) -> torch.dtype:
   return torch.float16 if device == "cuda" else torch.float32
 
 
-def build_quant_config(precision: str):
-  if precision != "int8":
+def build_quant_config(precision: str, device: str):
+  if precision != "int8" or device != "cuda":
     return None
   if BitsAndBytesConfig is None:
     LOGGER.warning("bitsandbytes not installed; falling back to float precision.")
@@ -104,108 +1302,1149 @@ def build_quant_config(precision: str):
   return BitsAndBytesConfig(load_in_8bit=True)
 
 
+def quantize_for_cpu(model: M2M100ForConditionalGeneration) -> M2M100ForConditionalGeneration:
+  """Swap every ``nn.Linear`` for a dynamically quantized int8 equivalent.
+
+  Weights are stored as int8 and activations are quantized on the fly per batch, so
+  no calibration data is needed. Embeddings and layer norms stay in float32.
+  """
+  engines = torch.backends.quantized.supported_engines
+  for engine in ("x86", "fbgemm", "qnnpack"):
+    if engine in engines:
+      torch.backends.quantized.engine = engine
+      break
+  return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class TransformersBackend:
+  """Runs a ``transformers``-compatible seq2seq model through ``generate``.
+
+  Both the PyTorch model and optimum's ONNX Runtime model (an exported encoder plus a
+  decoder that consumes past key/values) expose ``get_encoder`` and ``generate``, so
+  they share the same greedy and beam search implementation and produce the same
+  output shapes.
+  """
+
+  def __init__(self, name: str, model: Any, precision: str, inference_mode: bool = False) -> None:
+    self.name = name
+    self.model = model
+    self.precision = precision
+    self.inference_mode = inference_mode
+    self.device = torch.device(model.device)
+    self.decoder_start_token_id = model.config.decoder_start_token_id
+    self.eos_token_id = model.config.eos_token_id
+    # ONNX Runtime copies inputs to numpy and needs them contiguous.
+    self._broadcast_views = name == "torch"
+
+  def generate(
+      self,
+      input_ids: torch.Tensor,
+      attention_mask: torch.Tensor,
+      row_sources: list[int],
+      decoder_input_ids: torch.Tensor,
+      max_new_tokens: int,
+      num_beams: int,
+      no_repeat_ngram_size: int,
+      on_finished: Optional[Callable[[int, torch.Tensor], None]] = None,
+  ) -> torch.Tensor:
+    """Encode each source once, fan the states out to ``row_sources`` and decode every row.
+
+    With greedy search, ``on_finished(row, tokens)`` is called as each row emits EOS,
+    while the other rows are still decoding. Beam search settles its hypotheses only
+    at the end, so there it is never called.
+    """
+    # inference_mode also skips version counting and view tracking, which no_grad keeps.
+    with torch.inference_mode() if self.inference_mode else torch.no_grad():
+      return self._generate(
+          input_ids,
+          attention_mask,
+          row_sources,
+          decoder_input_ids,
+          max_new_tokens,
+          num_beams,
+          no_repeat_ngram_size,
+          on_finished,
+      )
+
+  def _generate(
+      self,
+      input_ids: torch.Tensor,
+      attention_mask: torch.Tensor,
+      row_sources: list[int],
+      decoder_input_ids: torch.Tensor,
+      max_new_tokens: int,
+      num_beams: int,
+      no_repeat_ngram_size: int,
+      on_finished: Optional[Callable[[int, torch.Tensor], None]] = None,
+  ) -> torch.Tensor:
+    input_ids = input_ids.to(self.device)
+    attention_mask = attention_mask.to(self.device)
+    rows = len(row_sources)
+    encoder_outputs = self.model.get_encoder()(input_ids=input_ids, attention_mask=attention_mask, return_dict=True)
+    hidden_states = encoder_outputs.last_hidden_state
+    if input_ids.shape[0] == 1 and self._broadcast_views:
+      # expand() broadcasts without copying; generate() repeats rows per beam itself.
+      hidden_states = hidden_states.expand(rows, -1, -1)
+      attention_mask = attention_mask.expand(rows, -1)
+    elif rows != input_ids.shape[0]:
+      row_index = torch.tensor(row_sources, device=self.device)
+      hidden_states = hidden_states.index_select(0, row_index)
+      attention_mask = attention_mask.index_select(0, row_index)
+
+    return self.model.generate(
+        encoder_outputs=BaseModelOutput(last_hidden_state=hidden_states),
+        attention_mask=attention_mask,
+        decoder_input_ids=decoder_input_ids.to(self.device),
+        max_new_tokens=max_new_tokens,
+        num_beams=num_beams,
+        no_repeat_ngram_size=no_repeat_ngram_size,
+        stopping_criteria=[_FinishedRows(self.eos_token_id, on_finished)] if on_finished and num_beams == 1 else None,
+    ).cpu()
+
+
+class _FinishedRows:
+  """``generate`` stopping criterion that never stops, but reports rows as they emit EOS.
+
+  Greedy search pads a row after its EOS, so a row whose newest token is EOS has
+  just finished.
+  """
+
+  def __init__(self, eos_token_id: int, on_finished: Callable[[int, torch.Tensor], None]) -> None:
+    self.eos_token_id = eos_token_id
+    self.on_finished = on_finished
+    self.reported: set[int] = set()
+
+  def __call__(self, input_ids: torch.Tensor, scores: torch.Tensor, **kwargs: Any) -> torch.Tensor:
+    for row in (input_ids[:, -1] == self.eos_token_id).nonzero().flatten().tolist():
+      if row not in self.reported:
+        self.reported.add(row)
+        self.on_finished(row, input_ids[row].cpu())
+    return torch.zeros(input_ids.shape[0], dtype=torch.bool, device=input_ids.device)
+
+
+def load_stored_weights(model_path: Path) -> Dict[str, str]:
+  """Return the ``weights`` block ``fetch.py`` records in ``manifest-lock.json``."""
+  try:
+    with (model_path / "manifest-lock.json").open("r", encoding="utf-8") as handle:
+      weights = json.load(handle).get("weights") or {}
+  except (OSError, json.JSONDecodeError):
+    weights = {}
+  if "format" not in weights:
+    weights["format"] = "safetensors" if (model_path / "model.safetensors").exists() else "pytorch"
+  return weights
+
+
+def load_torch_backend(device: str) -> TransformersBackend:
+  dtype = resolve_dtype(SERVICE_CONFIG.precision, device)
+  quant_config = build_quant_config(SERVICE_CONFIG.precision, device)
+
+  # safetensors are memory-mapped; with low_cpu_mem_usage the parameters are built
+  # straight from the mapping instead of a randomly initialized copy. When the
+  # stored dtype matches no cast is needed, so CPU weights stay backed by the
+  # shared page cache across restarts and processes.
+  weights = load_stored_weights(SERVICE_CONFIG.model_path)
+  model_kwargs = {
+      "torch_dtype": dtype,
+      "low_cpu_mem_usage": True,
+      "use_safetensors": weights["format"] == "safetensors",
+  }
+  if quant_config is not None:
+    model_kwargs["quantization_config"] = quant_config
+  if weights["format"] != "safetensors":
+    LOGGER.warning("Loading pickled weights; run scripts/m2m100/fetch.py to convert them to safetensors.")
+  elif weights.get("dtype") not in {None, str(dtype).removeprefix("torch.")}:
+    LOGGER.warning(
+        "Stored %s weights are cast to %s at load time; fetch with --precision %s to map them directly.",
+        weights["dtype"],
+        dtype,
+        str(dtype).removeprefix("torch."),
+    )
+
+  LOGGER.info("Loading %s from %s on %s (%s)", SERVICE_CONFIG.model_id, SERVICE_CONFIG.model_path, device, dtype)
+  model = M2M100ForConditionalGeneration.from_pretrained(SERVICE_CONFIG.model_path, **model_kwargs)
+
+  precision = "float16" if dtype == torch.float16 else "float32"
+  if quant_config is not None:
+    # bitsandbytes already placed the int8 weights on the GPU.
+    precision = "int8-bitsandbytes"
+  elif device == "cuda":
+    model.to(device)
+  elif SERVICE_CONFIG.precision == "int8":
+    model = quantize_for_cpu(model)
+    precision = "int8-dynamic"
+  model.eval()
+  if SERVICE_CONFIG.compile:
+    compile_for_inference(model, SERVICE_CONFIG.compile_cache_dir)
+    precision += "-compiled"
+  return TransformersBackend("torch", model, precision, inference_mode=SERVICE_CONFIG.compile)
+
+
+def compile_for_inference(model: M2M100ForConditionalGeneration, cache_dir: Path) -> None:
+  """Compile the encoder and the per-step decoder in place with TorchInductor.
+
+  Compilation happens lazily on the first call per shape, which warmup triggers for
+  every length bucket. Inductor's FX graph cache lives in ``cache_dir`` so later
+  starts reuse the generated kernels instead of compiling again. If a graph fails to
+  compile, dynamo falls back to eager for it rather than failing the request.
+  """
+  cache_dir.mkdir(parents=True, exist_ok=True)
+  # Assigned outright: inductor writes its /tmp default into the environment the first
+  # time it resolves the cache dir, so setdefault would keep that instead.
+  os.environ["TORCHINDUCTOR_CACHE_DIR"] = str(cache_dir)
+  import torch._dynamo
+  import torch._inductor.config
+
+  torch._inductor.config.fx_graph_cache = True
+  torch._dynamo.config.suppress_errors = True
+  # Source widths are padded to length buckets; batch rows still vary.
+  model.get_encoder().compile()
+  # The decoder runs once per generated token with a growing KV cache.
+  model.get_decoder().compile(dynamic=True)
+  LOGGER.info("Compiling encoder and decoder with torch.compile (cache: %s)", cache_dir)
+
+
+def bucket_width(width: int, buckets: list[int]) -> int:
+  return next((bucket for bucket in sorted(buckets) if bucket >= width), width)
+
+
+def load_onnx_backend(device: str) -> TransformersBackend:
+  try:
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+  except ImportError as exc:
+    raise RuntimeError("--backend onnx requires `pip install optimum[onnxruntime]`.") from exc
+
+  onnx_path = SERVICE_CONFIG.onnx_path or SERVICE_CONFIG.model_path / "onnx"
+  if not (onnx_path / "encoder_model.onnx").exists():
+    raise RuntimeError(f"No ONNX export in {onnx_path}. Run scripts/m2m100/fetch.py --export-onnx first.")
+  if SERVICE_CONFIG.precision not in {"auto", "float32"}:
+    LOGGER.warning("The ONNX export runs in float32; ignoring --precision %s.", SERVICE_CONFIG.precision)
+
+  provider = "CUDAExecutionProvider" if device == "cuda" else "CPUExecutionProvider"
+  LOGGER.info("Loading ONNX Runtime export from %s (%s)", onnx_path, provider)
+  model = ORTModelForSeq2SeqLM.from_pretrained(onnx_path, use_cache=True, provider=provider)
+  return TransformersBackend("onnx", model, "float32")
+
+
+class CTranslate2Backend:
+  """Serves a CTranslate2 conversion of the model with its native batched beam search.
+
+  CTranslate2 works on token strings, so rows are converted from the ids produced by
+  ``encode_sources`` and back. Results are re-packed as ``[decoder_start, <lang>, ...]``
+  id rows (with EOS when decoding finished early) so ``generate_batch`` treats them
+  exactly like ``transformers`` output.
+  """
+
+  name = "ctranslate2"
+
+  def __init__(self, translator: Any, tokenizer: _TokenizerClass, decoder_start_token_id: int) -> None:
+    self.translator = translator
+    self.tokenizer = tokenizer
+    self.precision = translator.compute_type
+    self.decoder_start_token_id = decoder_start_token_id
+    self.eos_token_id = tokenizer.eos_token_id
+
+  def generate(
+      self,
+      input_ids: torch.Tensor,
+      attention_mask: torch.Tensor,
+      row_sources: list[int],
+      decoder_input_ids: torch.Tensor,
+      max_new_tokens: int,
+      num_beams: int,
+      no_repeat_ngram_size: int,
+      on_finished: Optional[Callable[[int, torch.Tensor], None]] = None,
+  ) -> torch.Tensor:
+    # translate_batch returns only once every row is done, so on_finished is never called.
+    lengths = attention_mask.sum(dim=1).tolist()
+    sources = [self.tokenizer.convert_ids_to_tokens(input_ids[row, : lengths[row]].tolist()) for row in range(len(lengths))]
+    prefixes = [self.tokenizer.convert_ids_to_tokens(row[1:].tolist()) for row in decoder_input_ids]
+    # max_decoding_length counts the target prefix (the language token).
+    results = self.translator.translate_batch(
+        [sources[source] for source in row_sources],
+        target_prefix=prefixes,
+        beam_size=num_beams,
+        max_decoding_length=max_new_tokens + 1,
+        no_repeat_ngram_size=no_repeat_ngram_size,
+    )
+    rows = []
+    for result in results:
+      hypothesis = self.tokenizer.convert_tokens_to_ids(result.hypotheses[0])
+      finished = len(hypothesis) <= max_new_tokens
+      rows.append([self.decoder_start_token_id, *hypothesis, *([self.eos_token_id] if finished else [])])
+    width = max(len(row) for row in rows)
+    return torch.tensor([row + [self.tokenizer.pad_token_id] * (width - len(row)) for row in rows], dtype=torch.long)
+
+
+def resolve_ctranslate2_path() -> Path:
+  if SERVICE_CONFIG.ctranslate2_path is not None:
+    return SERVICE_CONFIG.ctranslate2_path
+  try:
+    with REGISTRY_PATH.open("r", encoding="utf-8") as handle:
+      entry = json.load(handle).get(f"{SERVICE_CONFIG.model_id}:ctranslate2")
+  except (OSError, json.JSONDecodeError):
+    entry = None
+  if entry and entry.get("path"):
+    return Path(entry["path"])
+  return SERVICE_CONFIG.model_path / "ctranslate2"
+
+
+def load_ctranslate2_backend(device: str, tokenizer: _TokenizerClass) -> CTranslate2Backend:
+  try:
+    import ctranslate2
+  except ImportError as exc:
+    raise RuntimeError("--backend ctranslate2 requires `pip install ctranslate2`.") from exc
+
+  converted_path = resolve_ctranslate2_path()
+  if not (converted_path / "model.bin").exists():
+    raise RuntimeError(
+        f"No CTranslate2 model in {converted_path}. Run scripts/m2m100/fetch.py --convert-ctranslate2 first."
+    )
+  compute_type = {"int8": "int8", "float16": "float16", "float32": "float32"}.get(SERVICE_CONFIG.precision, "default")
+  LOGGER.info("Loading CTranslate2 model from %s on %s (%s)", converted_path, device, compute_type)
+  translator = ctranslate2.Translator(
+      str(converted_path),
+      device=device,
+      compute_type=compute_type,
+      inter_threads=SERVICE_CONFIG.inference_threads,
+      intra_threads=intra_op_threads(SERVICE_CONFIG) or 0,
+  )
+  config = M2M100Config.from_pretrained(SERVICE_CONFIG.model_path)
+  return CTranslate2Backend(translator, tokenizer, config.decoder_start_token_id)
+
+
+def runtime_ready() -> bool:
+  if _tokenizer is None:
+    return False
+  if isinstance(_inference_queue, WorkerPool):
+    return _inference_queue.ready
+  return _backend is not None
+
+
+def runtime_precision() -> str:
+  if isinstance(_inference_queue, WorkerPool):
+    return _inference_queue.precision
+  return _backend.precision if _backend is not None else "not-loaded"
+
+
+@dataclass
+class LoadProgress:
+  """Startup state reported by ``/health``: loading -> warming -> ready, or failed."""
+
+  status: str = "loading"
+  stage: str = "waiting for first request"
+  started: Optional[float] = None
+  finished: Optional[float] = None
+  error: Optional[str] = None
+
+  def begin(self) -> None:
+    self.status, self.error, self.finished = "loading", None, None
+    self.started = time.perf_counter()
+
+  def advance(self, stage: str, status: Optional[str] = None) -> None:
+    self.stage = stage
+    self.status = status or self.status
+    LOGGER.info("Startup: %s", stage)
+
+  def finish(self, status: str, error: Optional[str] = None) -> None:
+    self.status, self.error = status, error
+    self.stage = "done" if error is None else "failed"
+    self.finished = time.perf_counter()
+
+  def snapshot(self) -> Dict[str, Any]:
+    report: Dict[str, Any] = {"status": self.status, "stage": self.stage}
+    if self.started is not None:
+      report["elapsed_s"] = round((self.finished or time.perf_counter()) - self.started, 2)
+    if self.error is not None:
+      report["error"] = self.error
+    return report
+
+
+_load_progress = LoadProgress()
+
+
 async def ensure_runtime_loaded() -> None:
-  global _model, _tokenizer
-  if _model is not None and _tokenizer is not None:
+  if runtime_ready():
     return
 
   async with _runtime_lock:
-    if _model is not None and _tokenizer is not None:
+    if runtime_ready():
       return
+    _load_progress.begin()
+    try:
+      await load_runtime()
+    except Exception as exc:
+      _load_progress.finish("failed", f"{type(exc).__name__}: {exc}")
+      raise
+    _load_progress.status = "warming"
+    await warm_up()
+    _metrics.reset()  # warmup and compilation would skew the latency histograms
+    _load_progress.finish("ready")
 
-    device = resolve_device(SERVICE_CONFIG.device)
-    dtype = resolve_dtype(SERVICE_CONFIG.precision, device)
-    quant_config = build_quant_config(SERVICE_CONFIG.precision)
 
-    model_kwargs = {
-        "torch_dtype": dtype,
-    }
-    if quant_config is not None:
-      model_kwargs["quantization_config"] = quant_config
+async def load_runtime() -> None:
+  """Load tokenizer and model on helper threads so the event loop keeps serving ``/health``."""
+  global _backend, _tokenizer, _model_revision, _device
+  _load_progress.advance("importing torch and transformers")
+  await asyncio.to_thread(import_inference_modules)
+  device = resolve_device(SERVICE_CONFIG.device)
+  _load_progress.advance("loading tokenizer")
+  tokenizer = await asyncio.to_thread(_TokenizerClass.from_pretrained, SERVICE_CONFIG.model_path)
+  if isinstance(_inference_queue, WorkerPool):
+    # The front process only tokenizes; the model lives in the workers.
+    _tokenizer = tokenizer
+    _device = device
+    _model_revision = load_model_revision(SERVICE_CONFIG.model_path)
+    _load_progress.advance(f"starting {_inference_queue.workers} workers")
+    await _inference_queue.start()
+    LOGGER.info("Model ready in %s workers (%s)", _inference_queue.workers, _inference_queue.precision)
+    return
+  # Pin on the loop thread: inference threads are created from it and inherit its affinity.
+  apply_thread_settings(SERVICE_CONFIG)
+  _load_progress.advance(f"loading {SERVICE_CONFIG.backend} model on {device}")
+  backend = await asyncio.to_thread(load_backend, device, tokenizer)
 
-    LOGGER.info("Loading %s from %s on %s (%s)", SERVICE_CONFIG.model_id, SERVICE_CONFIG.model_path, device, dtype)
-    model = M2M100ForConditionalGeneration.from_pretrained(SERVICE_CONFIG.model_path, **model_kwargs)
-    tokenizer = _TokenizerClass.from_pretrained(SERVICE_CONFIG.model_path)
+  _backend = backend
+  _device = device
+  _tokenizer = tokenizer
+  _model_revision = load_model_revision(SERVICE_CONFIG.model_path)
+  LOGGER.info(
+      "Model ready (%s, %s). Supported languages: %s",
+      backend.name,
+      backend.precision,
+      len(tokenizer.lang_code_to_id),
+  )
 
-    if device == "cuda":
-      model.to(device)
 
-    _model = model
-    _tokenizer = tokenizer
-    LOGGER.info("Model ready. Supported languages: %s", len(tokenizer.lang_code_to_id))
+def load_backend(device: str, tokenizer: Any) -> TransformersBackend | CTranslate2Backend:
+  if SERVICE_CONFIG.backend == "ctranslate2":
+    return load_ctranslate2_backend(device, tokenizer)
+  if SERVICE_CONFIG.backend == "onnx":
+    return load_onnx_backend(device)
+  return load_torch_backend(device)
 
 
-def generate_translation(text: str, lang: str, source_language: str, max_length: int, beam_size: int) -> str:
-  if _model is None or _tokenizer is None:
+def resolve_lang_id(tokenizer: _TokenizerClass, lang: str) -> int:
+  try:
+    return tokenizer.get_lang_id(lang)
+  except KeyError as exc:
+    raise HTTPException(status_code=400, detail=f"Unsupported language code: {lang}") from exc
+
+
+def encode_sources(texts: list[str], source_languages: list[str]) -> tuple[torch.Tensor, torch.Tensor]:
+  """Tokenize sources as ``[<src_lang>] tokens </s>`` rows, right-padded into one batch.
+
+  The language prefix is built per row instead of via ``tokenizer.src_lang``, which
+  would mutate the shared tokenizer and force one source language per batch.
+  """
+  if _tokenizer is None:
+    raise RuntimeError("Model not loaded")
+  tokenizer = _tokenizer
+  bodies = tokenizer(texts, add_special_tokens=False)["input_ids"]
+  rows = [
+      [resolve_lang_id(tokenizer, lang), *body, tokenizer.eos_token_id]
+      for lang, body in zip(source_languages, bodies)
+  ]
+  width = max(len(row) for row in rows)
+  if SERVICE_CONFIG.compile:
+    width = bucket_width(width, SERVICE_CONFIG.length_buckets)
+  input_ids = torch.full((len(rows), width), tokenizer.pad_token_id, dtype=torch.long)
+  attention_mask = torch.zeros((len(rows), width), dtype=torch.long)
+  for index, row in enumerate(rows):
+    input_ids[index, : len(row)] = torch.tensor(row, dtype=torch.long)
+    attention_mask[index, : len(row)] = 1
+  return input_ids, attention_mask
+
+
+@dataclass
+class TranslationOutput:
+  """Translations of one source text, with what producing them cost.
+
+  ``usage`` maps each language to the source tokens encoded, target tokens produced and
+  decoder steps run for its row. ``timings`` holds the seconds spent per stage
+  (tokenize, generate, decode) by the ``generate`` call that produced the row; rows
+  batched together share them. ``finished`` is false for rows the decode budget cut
+  off before EOS.
+  """
+
+  translations: Dict[str, str]
+  usage: Dict[str, Dict[str, int]]
+  timings: Dict[str, float]
+  finished: Dict[str, bool]
+
+
+def generate_batch(
+    texts: list[str],
+    source_languages: list[str],
+    targets: list[list[str]],
+    max_length: int,
+    beam_size: int,
+    no_repeat_ngram_size: int = 3,
+) -> list[Dict[str, str]]:
+  outputs = generate_batch_with_usage(texts, source_languages, targets, max_length, beam_size, no_repeat_ngram_size)
+  return [output.translations for output in outputs]
+
+
+def row_usage(input_tokens: int, output_tokens: int, finished: bool) -> Dict[str, int]:
+  # A finished row also spent one step emitting EOS.
+  return {"input_tokens": input_tokens, "output_tokens": output_tokens, "decode_steps": output_tokens + int(finished)}
+
+
+def generate_batch_with_usage(
+    texts: list[str],
+    source_languages: list[str],
+    targets: list[list[str]],
+    max_length: int,
+    beam_size: int,
+    no_repeat_ngram_size: int = 3,
+) -> list[TranslationOutput]:
+  """Translate several source strings, each into its own target languages, with one ``generate`` call.
+
+  The sources are tokenized as one padded batch and run through the encoder once.
+  Each source's hidden states are fanned out to one row per requested target
+  language, and each row starts decoding from ``[decoder_start, <lang>]`` so the
+  target BOS differs per row without ``forced_bos_token_id``. Decoding stops after
+  the largest per-row ``DecodeBudget`` allowance, with ``max_length`` as the hard
+  ceiling. Results come back in ``texts`` order. When the caller asked for progress,
+  each row that finishes early is also reported as ``(source, lang, translation,
+  usage, generate_seconds)``.
+  """
+  if _backend is None or _tokenizer is None:
     raise RuntimeError("Model not loaded")
 
   tokenizer = _tokenizer
-  model = _model
-  tokenizer.src_lang = source_language
+  backend = _backend
 
-  encoded = tokenizer(text, return_tensors="pt")
-  try:
-    device = next(model.parameters()).device
-  except StopIteration:
-    device = torch.device("cpu")
-  encoded = {key: value.to(device) for key, value in encoded.items()}
-  try:
-    forced_bos_token_id = tokenizer.get_lang_id(lang)
-  except KeyError as exc:
-    raise HTTPException(status_code=400, detail=f"Unsupported language code: {lang}") from exc
+  row_sources: list[int] = []
+  row_langs: list[str] = []
+  row_lang_ids: list[int] = []
+  for index, languages in enumerate(targets):
+    for lang in dict.fromkeys(languages):
+      row_sources.append(index)
+      row_langs.append(lang)
+      row_lang_ids.append(resolve_lang_id(tokenizer, lang))
 
-  generated_tokens = model.generate(
-      **encoded,
-      forced_bos_token_id=forced_bos_token_id,
-      max_length=max_length,
-      num_beams=beam_size,
-      no_repeat_ngram_size=3,
+  timings: Dict[str, float] = {}
+  started = time.perf_counter()
+  input_ids, attention_mask = encode_sources(texts, source_languages)
+  source_tokens = (attention_mask.sum(dim=1) - 2).tolist()
+  timings["tokenize"] = time.perf_counter() - started
+
+  # The decoder prompt [decoder_start, <lang>] already counts towards max_length.
+  prompt_length = 2
+  ceiling = max(1, max_length - prompt_length)
+  max_new_tokens = max(
+      _decode_budget.max_new_tokens(source_tokens[source], lang, ceiling)
+      for source, lang in zip(row_sources, row_langs)
   )
+  decoder_input_ids = torch.tensor([[backend.decoder_start_token_id, lang_id] for lang_id in row_lang_ids])
+
+  def content_tokens(continuation: torch.Tensor) -> torch.Tensor:
+    return ((continuation != tokenizer.pad_token_id) & (continuation != backend.eos_token_id)).sum(dim=-1)
+
+  def report_row(row: int, tokens: torch.Tensor) -> None:
+    source = row_sources[row]
+    produced = int(content_tokens(tokens[prompt_length:]))
+    translation = tokenizer.decode(tokens, skip_special_tokens=True).strip()
+    usage = row_usage(source_tokens[source], produced, True)
+    report_progress((source, row_langs[row], translation, usage, time.perf_counter() - started))
+
+  started = time.perf_counter()
+  generated_tokens = backend.generate(
+      input_ids,
+      attention_mask,
+      row_sources,
+      decoder_input_ids,
+      max_new_tokens,
+      beam_size,
+      no_repeat_ngram_size,
+      on_finished=report_row if wants_progress() else None,
+  )
+  timings["generate"] = time.perf_counter() - started
+  continuation = generated_tokens[:, prompt_length:]
+  finished = (continuation == backend.eos_token_id).any(dim=1).tolist()
+  output_tokens = content_tokens(continuation)
+  for source, lang, produced, done in zip(row_sources, row_langs, output_tokens.tolist(), finished):
+    _decode_budget.observe(lang, source_tokens[source], produced, done)
+
+  started = time.perf_counter()
   decoded = tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)
-  return decoded[0].strip()
+  timings["decode"] = time.perf_counter() - started
+  for stage, seconds in timings.items():
+    _metrics.stage(stage, seconds)
+
+  results = [TranslationOutput({}, {}, timings, {}) for _ in texts]
+  rows = zip(row_sources, row_langs, decoded, output_tokens.tolist(), finished)
+  for source, lang, translation, produced, done in rows:
+    results[source].translations[lang] = translation.strip()
+    results[source].finished[lang] = done
+    results[source].usage[lang] = row_usage(source_tokens[source], produced, done)
+    _metrics.inc("m2m100_translations_total", source=source_languages[source], target=lang, origin="model")
+    if not done:
+      _metrics.inc("m2m100_truncated_rows_total", target=lang)
+  _metrics.observe("m2m100_batch_rows", len(row_sources))
+  _metrics.inc("m2m100_input_tokens_total", sum(source_tokens))
+  _metrics.inc("m2m100_output_tokens_total", int(output_tokens.sum()))
+  return results
+
+
+def generate_translations(
+    text: str,
+    target_languages: list[str],
+    source_language: str,
+    max_length: int,
+    beam_size: int,
+    no_repeat_ngram_size: int = 3,
+) -> Dict[str, str]:
+  return generate_batch([text], [source_language], [target_languages], max_length, beam_size, no_repeat_ngram_size)[0]
+
+
+def count_tokens(texts: list[str]) -> list[int]:
+  if _tokenizer is None:
+    raise RuntimeError("Model not loaded")
+  encoded = _tokenizer(texts, add_special_tokens=False)
+  return [len(ids) for ids in encoded["input_ids"]]
+
+
+def plan_length_buckets(lengths: list[int], texts_per_batch: int) -> list[list[int]]:
+  """Group indices of similar token length so each padded batch wastes little compute."""
+  order = sorted(range(len(lengths)), key=lengths.__getitem__)
+  return [order[start:start + texts_per_batch] for start in range(0, len(order), texts_per_batch)]
+
+
+def generate_translation(text: str, lang: str, source_language: str, max_length: int, beam_size: int) -> str:
+  return generate_translations(text, [lang], source_language, max_length, beam_size)[lang]
+
+
+def bucket_warmup_texts(buckets: list[int]) -> list[str]:
+  """Synthetic sources whose encoded width (with language tag and EOS) fills each bucket."""
+  ids = _tokenizer(" ".join(WARMUP_TEXTS), add_special_tokens=False)["input_ids"]
+  texts = []
+  for bucket in sorted(buckets):
+    needed = max(1, bucket - 3)
+    repeated = (ids * (needed // len(ids) + 1))[:needed]
+    texts.append(_tokenizer.decode(repeated))
+  return texts
+
+
+async def warm_up() -> None:
+  """Run synthetic translations so first requests don't pay for lazy initialization.
+
+  Kernel selection, allocator growth and tokenizer caches all happen on the first
+  calls. Each round translates ``WARMUP_TEXTS`` into the warmup languages, one text
+  at a time and then as one padded batch, once per worker. With ``--compile`` it also
+  sends one text per length bucket so every bucket's graphs are compiled up front.
+  """
+  config = SERVICE_CONFIG
+  if config.warmup_rounds <= 0 or not config.warmup_languages:
+    return
+  copies = _inference_queue.workers if isinstance(_inference_queue, WorkerPool) else 1
+  shapes = [[text] for text in WARMUP_TEXTS] + [list(WARMUP_TEXTS)]
+  if config.compile:
+    shapes += [[text] for text in bucket_warmup_texts(config.length_buckets)]
+  for round_index in range(config.warmup_rounds):
+    _load_progress.advance(f"warmup round {round_index + 1}/{config.warmup_rounds}")
+    started = time.perf_counter()
+    try:
+      for texts in shapes:
+        # Warm the beam widths the decoding policy will actually pick for these lengths.
+        decoding = _decoding_policy.choose(max(count_tokens(texts)), config.beam_size)
+        await asyncio.gather(*[
+            _inference_queue.run(
+                generate_batch,
+                texts,
+                [config.source_language] * len(texts),
+                [config.warmup_languages] * len(texts),
+                config.max_length,
+                decoding.beam_size,
+                decoding.no_repeat_ngram_size,
+            )
+            for _ in range(copies)
+        ])
+    except Exception as exc:  # A failed warmup only costs latency, never availability.
+      LOGGER.warning("Warmup stopped early: %s", getattr(exc, "detail", exc))
+      return
+    LOGGER.info(
+        "Warmup round %s/%s took %.0f ms",
+        round_index + 1,
+        config.warmup_rounds,
+        (time.perf_counter() - started) * 1000,
+    )
 
 
 @app.on_event("startup")
 async def _startup_event() -> None:
+  global _memory, _preload_task
+  if SERVICE_CONFIG.translation_memory is not None and _memory is None:
+    _memory = TranslationMemory(SERVICE_CONFIG.translation_memory)
+    LOGGER.info("Translation memory at %s", SERVICE_CONFIG.translation_memory)
   if SERVICE_CONFIG.preload:
-    await ensure_runtime_loaded()
+    # Load in the background so uvicorn binds the port immediately and /health
+    # can report progress; requests arriving meanwhile wait in ensure_runtime_loaded.
+    _preload_task = asyncio.create_task(ensure_runtime_loaded())
+    _preload_task.add_done_callback(_log_preload_failure)
+
+
+def _log_preload_failure(task: asyncio.Task) -> None:
+  if not task.cancelled() and task.exception() is not None:
+    LOGGER.error("Model failed to load: %s", task.exception())
+
+
+@app.on_event("shutdown")
+async def _shutdown_event() -> None:
+  global _memory
+  _inference_queue.shutdown()
+  if _memory is not None:
+    _memory.close()
+    _memory = None
 
 
 @app.get("/health")
-async def healthcheck() -> Dict[str, str]:
-  status = "ready" if _model is not None else "initializing"
-  return {"status": status}
+async def healthcheck() -> Dict[str, Any]:
+  return _load_progress.snapshot()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+  """Prometheus text exposition; readable with curl too."""
+  tokens_in, tokens_out = _metrics.tokens_per_second()
+  cache = _cache.stats()
+  lookups = cache["hits"] + cache["misses"]
+  gauges = {
+      "m2m100_input_tokens_per_second": (f"Source tokens per second over the last {THROUGHPUT_WINDOW_S:g}s.", tokens_in),
+      "m2m100_output_tokens_per_second": (f"Target tokens per second over the last {THROUGHPUT_WINDOW_S:g}s.", tokens_out),
+      "m2m100_queue_depth": ("Inference calls running or waiting.", _inference_queue.depth),
+      "m2m100_queue_capacity": ("Inference calls accepted before returning 503.", _inference_queue.max_pending),
+      "m2m100_cache_hit_ratio": ("In-memory cache hits over lookups.", cache["hits"] / lookups if lookups else 0.0),
+      "m2m100_cache_entries": ("Translations held in the in-memory cache.", cache["entries"]),
+      "m2m100_degradation_level": ("Quality degradation applied to bulk requests (0 = none).", _governor.level),
+      "m2m100_ready": ("1 once the model is loaded and warmed up.", float(_load_progress.status == "ready")),
+  }
+  return PlainTextResponse(_metrics.render(gauges), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/metadata", response_model=MetadataResponse)
 async def metadata() -> MetadataResponse:
-  device = resolve_device(SERVICE_CONFIG.device)
   return MetadataResponse(
       model_id=SERVICE_CONFIG.model_id,
-      device=device,
-      precision=SERVICE_CONFIG.precision,
+      model_revision=_model_revision,
+      device=_device or SERVICE_CONFIG.device or "auto",
+      backend=SERVICE_CONFIG.backend,
+      precision=runtime_precision(),
+      requested_precision=SERVICE_CONFIG.precision,
       max_length=SERVICE_CONFIG.max_length,
       beam_size=SERVICE_CONFIG.beam_size,
+      workers=SERVICE_CONFIG.workers,
+      threads=(
+          _inference_queue.thread_settings()
+          if isinstance(_inference_queue, WorkerPool)
+          else current_thread_settings()
+      ),
+      load={**_governor.snapshot(), "queue_depth": _inference_queue.depth, "max_queue": _inference_queue.max_pending},
+      decoding_policy={
+          "name": SERVICE_CONFIG.decoding_policy,
+          "beam_tiers": SERVICE_CONFIG.beam_tiers,
+          "no_repeat_ngram_size": SERVICE_CONFIG.no_repeat_ngram_size,
+      },
+      cache=_cache.stats(),
+      translation_memory=_memory.stats() if _memory is not None else None,
+      length_ratios=None if isinstance(_inference_queue, WorkerPool) else _decode_budget.snapshot(),
+      truncated_rows=int(_metrics.total("m2m100_truncated_rows_total")),
+  )
+
+
+@dataclass
+class _TranslationPlan:
+  text: str
+  source_language: str
+  target_languages: list[str]
+  max_length: int
+  decoding: DecodeChoice
+  keys: Dict[str, CacheKey]
+
+
+def queue_fill() -> float:
+  return _inference_queue.depth / _inference_queue.max_pending
+
+
+def degradation_level(priority: Priority) -> int:
+  level = _governor.update(queue_fill())
+  return level if priority == "bulk" else 0
+
+
+def choose_decoding(
+    source_tokens: int, requested_beam: Optional[int], max_length: int, level: int
+) -> tuple[DecodeChoice, int]:
+  """Apply the decoding policy, then any load degradation; returns the choice and max_length.
+
+  An explicit ``beam_size`` in the request bypasses the policy but not degradation.
+  """
+  if requested_beam:
+    decoding = DecodeChoice("requested", requested_beam, SERVICE_CONFIG.no_repeat_ngram_size, source_tokens)
+  else:
+    decoding = _decoding_policy.choose(source_tokens, SERVICE_CONFIG.beam_size)
+  return _governor.degrade(decoding, max_length, level)
+
+
+def plan_translation(payload: TranslatePayload) -> _TranslationPlan:
+  max_length = payload.max_length or SERVICE_CONFIG.max_length
+  source_language = payload.source_language or SERVICE_CONFIG.source_language
+
+  target_languages = list(dict.fromkeys(payload.target_languages))
+  for lang in [source_language, *target_languages]:
+    resolve_lang_id(_tokenizer, lang)
+
+  text = build_prompt(payload.source_text, payload.context)
+  decoding, max_length = choose_decoding(
+      count_tokens([text])[0], payload.beam_size, max_length, degradation_level(payload.priority)
   )
+  return _TranslationPlan(
+      text=text,
+      source_language=source_language,
+      target_languages=target_languages,
+      max_length=max_length,
+      decoding=decoding,
+      keys={
+          lang: cache_key(
+              payload.source_text,
+              payload.context,
+              source_language,
+              lang,
+              decoding.beam_size,
+              max_length,
+              decoding.no_repeat_ngram_size,
+          )
+          for lang in target_languages
+      },
+  )
+
+
+class InferenceSpan:
+  """Wall time from a request's first inference submit to its last completion.
+
+  Calls that run concurrently overlap, so summing their durations would count the
+  overlap twice and report more queue time than the request took.
+  """
+
+  def __init__(self) -> None:
+    self.first: Optional[float] = None
+    self.last: Optional[float] = None
+
+  def submit(self) -> None:
+    if self.first is None:
+      self.first = time.perf_counter()
+
+  def complete(self) -> None:
+    self.last = time.perf_counter()
+
+  @property
+  def seconds(self) -> float:
+    if self.first is None or self.last is None:
+      return 0.0
+    return self.last - self.first
+
+
+def model_usage(output: TranslationOutput, lang: str) -> Dict[str, Any]:
+  return {"source": "model", **output.usage[lang]}
+
+
+def cached_usage(source: str = "cache") -> Dict[str, Any]:
+  """Usage of a translation that cost no model work."""
+  return {"source": source, "input_tokens": 0, "output_tokens": 0, "decode_steps": 0}
+
+
+def add_timings(totals: Dict[str, float], timings: Dict[str, float]) -> None:
+  for stage, seconds in timings.items():
+    totals[stage] = totals.get(stage, 0.0) + seconds
+
+
+def timing_breakdown(stages: Dict[str, float], inference_s: float, total_s: float) -> Dict[str, float]:
+  """Milliseconds per stage; ``queue`` is inference time spent outside the stages.
+
+  That covers the batching window, waiting for an inference slot and, with
+  ``--workers``, the hand-off to the worker process. Stages are summed over the
+  request's calls, so with concurrent calls they can add up to more than ``total``.
+  """
+  timings = {"queue": max(0.0, inference_s - sum(stages.values())), **stages, "total": total_s}
+  return {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()}
+
+
+def server_timing(timings_ms: Dict[str, float]) -> str:
+  return ", ".join(f"{stage};dur={ms}" for stage, ms in timings_ms.items())
 
 
 @app.post("/translate")
-async def translate(payload: TranslatePayload) -> Dict[str, Dict[str, str]]:
+async def translate(payload: TranslatePayload, response: Response) -> Dict[str, Any]:
   await ensure_runtime_loaded()
 
-  text = payload.source_text.strip()
-  if payload.context:
-    text = f"{payload.context.strip()}\n{text}"
+  started = time.perf_counter()
+  plan = plan_translation(payload)
+  translations = await lookup_translations(plan.keys) if payload.use_cache else {}
+  usage = {lang: cached_usage() for lang in translations}
+
+  missing = [lang for lang in plan.target_languages if lang not in translations]
+  stages: Dict[str, float] = {}
+  inference = 0.0
+  if missing:
+    submitted = time.perf_counter()
+    output = await _batcher.submit(
+        plan.text,
+        missing,
+        plan.source_language,
+        plan.max_length,
+        plan.decoding.beam_size,
+        plan.decoding.no_repeat_ngram_size,
+    )
+    inference = time.perf_counter() - submitted
+    if payload.priority == "interactive":
+      _governor.observe(inference)
+    for lang in missing:
+      store_output(plan.keys[lang], output, lang)
+      usage[lang] = model_usage(output, lang)
+    translations.update(output.translations)
+    stages = output.timings
 
+  response.headers["Server-Timing"] = server_timing(
+      timing_breakdown(stages, inference, time.perf_counter() - started)
+  )
+  return {
+      "translations": {lang: translations[lang] for lang in plan.target_languages},
+      "decoding": asdict(plan.decoding),
+      "usage": {lang: usage[lang] for lang in plan.target_languages},
+  }
+
+
+@app.post("/translate/stream")
+async def translate_stream(payload: TranslatePayload, request: Request) -> StreamingResponse:
+  """Stream one event per target language as soon as that language is ready.
+
+  Cached languages are sent first. The rest are decoded together in one call through
+  the micro-batcher, sharing one encode and one decode loop (and one queue slot) with
+  each other and with concurrent ``/translate`` calls. With greedy search each
+  language is sent as soon as its row emits EOS; with beam search, CTranslate2 or a
+  row cut off by the decode budget it is sent when the call returns. Sends
+  Server-Sent Events when the client accepts ``text/event-stream`` and
+  newline-delimited JSON otherwise; the last event always has ``"done": true``. A
+  language that could not be generated gets an event with ``error`` (and ``status``
+  for HTTP errors) instead of a translation. Headers go out before generation starts,
+  so usage and stage timings travel in the events instead of a ``Server-Timing`` header.
+  """
+  await ensure_runtime_loaded()
+  plan = plan_translation(payload)
+  use_sse = "text/event-stream" in request.headers.get("accept", "")
+
+  def encode(event: Dict[str, Any]) -> str:
+    body = json.dumps(event, ensure_ascii=False)
+    if use_sse:
+      return f"event: {'done' if event.get('done') else 'translation'}\ndata: {body}\n\n"
+    return f"{body}\n"
+
+  async def events() -> AsyncIterator[str]:
+    started = time.perf_counter()
+    cached = await lookup_translations(plan.keys) if payload.use_cache else {}
+    usage: Dict[str, Dict[str, Any]] = {}
+    stages: Dict[str, float] = {}
+    inference = InferenceSpan()
+    for lang in plan.target_languages:
+      if lang in cached:
+        usage[lang] = cached_usage()
+        yield encode({
+            "language": lang,
+            "translation": cached[lang],
+            "source": "cache",
+            "generate_ms": 0.0,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            "usage": usage[lang],
+        })
+
+    def model_event(lang: str, translation: str, generate_s: float) -> str:
+      return encode({
+          "language": lang,
+          "translation": translation,
+          "source": "model",
+          "generate_ms": round(generate_s * 1000, 2),
+          "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+          "usage": usage[lang],
+      })
+
+    missing = [lang for lang in plan.target_languages if lang not in cached]
+    if missing:
+      # Rows that finish early arrive here while the batch is still decoding; None ends the batch.
+      rows: asyncio.Queue[Optional[tuple[Any, ...]]] = asyncio.Queue()
+
+      def batch_done(_: asyncio.Future) -> None:
+        inference.complete()
+        rows.put_nowait(None)
+
+      inference.submit()
+      job = asyncio.ensure_future(_batcher.submit(
+          plan.text,
+          missing,
+          plan.source_language,
+          plan.max_length,
+          plan.decoding.beam_size,
+          plan.decoding.no_repeat_ngram_size,
+          on_row=lambda *row: rows.put_nowait(row),
+      ))
+      job.add_done_callback(batch_done)
+      try:
+        while (row := await rows.get()) is not None:
+          lang, translation, early_usage, generate_s = row
+          usage[lang] = {"source": "model", **early_usage}
+          yield model_event(lang, translation, generate_s)
+        output = job.result()
+      except Exception as exc:
+        if isinstance(exc, HTTPException):
+          error: Dict[str, Any] = {"error": str(exc.detail), "status": exc.status_code}
+        else:
+          LOGGER.exception("Streaming translation failed")
+          error = {"error": f"{type(exc).__name__}: {exc}"}
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        for lang in missing:
+          if lang not in usage:
+            yield encode({"language": lang, **error, "elapsed_ms": elapsed_ms})
+      else:
+        if payload.priority == "interactive":
+          _governor.observe(inference.seconds)
+        add_timings(stages, output.timings)
+        for lang in missing:
+          store_output(plan.keys[lang], output, lang)
+          sent = lang in usage
+          usage[lang] = model_usage(output, lang)
+          if not sent:
+            yield model_event(lang, output.translations[lang], output.timings.get("generate", 0.0))
+      finally:
+        job.cancel()
+    yield encode({
+        "done": True,
+        "decoding": asdict(plan.decoding),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        "usage": usage,
+        "timing_ms": timing_breakdown(stages, inference.seconds, time.perf_counter() - started),
+    })
+
+  media_type = "text/event-stream" if use_sse else "application/x-ndjson"
+  return StreamingResponse(events(), media_type=media_type)
+
+
+@app.post("/translate/batch")
+async def translate_batch(payload: BatchTranslatePayload, response: Response) -> Dict[str, Any]:
+  """Translate many keyed strings; identical sources are generated once and shared across keys."""
+  await ensure_runtime_loaded()
+
+  started = time.perf_counter()
   max_length = payload.max_length or SERVICE_CONFIG.max_length
-  beam_size = payload.beam_size or SERVICE_CONFIG.beam_size
   source_language = payload.source_language or SERVICE_CONFIG.source_language
+  target_languages = list(dict.fromkeys(payload.target_languages))
+  for lang in target_languages:
+    resolve_lang_id(_tokenizer, lang)
+
+  unique_sources: Dict[tuple[str, str, str], int] = {}
+  item_slots: list[int] = []
+  for item in payload.items:
+    item_language = item.source_language or source_language
+    resolve_lang_id(_tokenizer, item_language)
+    source = (normalize_text(item.source_text), normalize_text(item.context or ""), item_language)
+    item_slots.append(unique_sources.setdefault(source, len(unique_sources)))
+  sources = list(unique_sources)
+  texts = [build_prompt(source_text, context) for source_text, context, _ in sources]
+  lengths = await _inference_queue.run(count_tokens, texts)
+  level = degradation_level(payload.priority)
+  choices = [choose_decoding(length, payload.beam_size, max_length, level) for length in lengths]
+  decodings = [decoding for decoding, _ in choices]
+  # Degradation caps every row alike, so one ceiling serves the whole request.
+  max_length = min((capped for _, capped in choices), default=max_length)
+
+  keys = {
+      (slot, lang): cache_key(
+          source_text,
+          context,
+          item_language,
+          lang,
+          decodings[slot].beam_size,
+          max_length,
+          decodings[slot].no_repeat_ngram_size,
+      )
+      for slot, (source_text, context, item_language) in enumerate(sources)
+      for lang in target_languages
+  }
+  results: list[Dict[str, str]] = [{} for _ in sources]
+  usage: list[Dict[str, Dict[str, Any]]] = [{} for _ in sources]
+  if payload.use_cache:
+    for (slot, lang), translation in (await lookup_translations(keys)).items():
+      results[slot][lang] = translation
+      usage[slot][lang] = cached_usage()
+  missing = [[lang for lang in target_languages if lang not in results[slot]] for slot in range(len(sources))]
+
+  # Slots decoded with the same beam settings share batches, each padded by length bucket.
+  groups: Dict[tuple[int, int], list[int]] = {}
+  for slot, languages in enumerate(missing):
+    if languages:
+      groups.setdefault((decodings[slot].beam_size, decodings[slot].no_repeat_ngram_size), []).append(slot)
+  texts_per_batch = max(1, SERVICE_CONFIG.max_batch_rows // len(target_languages))
+  stages: Dict[str, float] = {}
+  inference = InferenceSpan()
+  # Buckets run concurrently, but never hold more queue slots than can execute at once.
+  slots_in_flight = asyncio.Semaphore(min(_inference_queue.parallelism, _inference_queue.max_pending))
+
+  async def run_bucket(slots: list[int], beam_size: int, no_repeat_ngram_size: int) -> None:
+    async with slots_in_flight:
+      inference.submit()
+      outputs = await _inference_queue.run(
+          generate_batch_with_usage,
+          [texts[slot] for slot in slots],
+          [sources[slot][2] for slot in slots],
+          [missing[slot] for slot in slots],
+          max_length,
+          beam_size,
+          no_repeat_ngram_size,
+      )
+      inference.complete()
+    add_timings(stages, outputs[0].timings)
+    for slot, output in zip(slots, outputs):
+      for lang in output.translations:
+        store_output(keys[(slot, lang)], output, lang)
+        usage[slot][lang] = model_usage(output, lang)
+      results[slot].update(output.translations)
+
+  await asyncio.gather(*(
+      run_bucket([pending[index] for index in bucket], beam_size, no_repeat_ngram_size)
+      for (beam_size, no_repeat_ngram_size), pending in groups.items()
+      for bucket in plan_length_buckets([lengths[slot] for slot in pending], texts_per_batch)
+  ))
 
-  translations: Dict[str, str] = {}
-  for lang in payload.target_languages:
-    translations[lang] = generate_translation(text, lang, source_language, max_length, beam_size)
+  # Keys sharing a source were translated once; only the first one carries the cost.
+  item_usage: Dict[str, Dict[str, Dict[str, Any]]] = {}
+  charged: set[int] = set()
+  for item, slot in zip(payload.items, item_slots):
+    if slot in charged:
+      item_usage[item.key] = {lang: cached_usage("duplicate") for lang in target_languages}
+    else:
+      item_usage[item.key] = {lang: usage[slot][lang] for lang in target_languages}
+      charged.add(slot)
+
+  response.headers["Server-Timing"] = server_timing(
+      timing_breakdown(stages, inference.seconds, time.perf_counter() - started)
+  )
+  return {
+      "translations": {
+          item.key: {lang: results[slot][lang] for lang in target_languages}
+          for item, slot in zip(payload.items, item_slots)
+      },
+      "decoding": {item.key: asdict(decodings[slot]) for item, slot in zip(payload.items, item_slots)},
+      "usage": item_usage,
+  }
+
+
+def parse_core_list(spec: str) -> list[int]:
+  cores: list[int] = []
+  for part in spec.split(","):
+    start, _, end = part.strip().partition("-")
+    cores.extend(range(int(start), int(end or start) + 1))
+  return sorted(set(cores))
 
-  return {"translations": translations}
+
+def parse_beam_tiers(spec: str) -> list[tuple[int, ...]]:
+  return [tuple(int(value) for value in tier.split(":")) for tier in spec.split(",") if tier.strip()]
 
 
 def parse_args() -> argparse.Namespace:
@@ -217,13 +2456,180 @@ def parse_args() -> argparse.Namespace:
       "--precision",
       choices=["auto", "float32", "float16", "int8"],
       default=SERVICE_CONFIG.precision,
-      help="Preferred precision; int8 requires bitsandbytes.",
+      help="Preferred precision; int8 uses bitsandbytes on CUDA and dynamic quantization on CPU.",
+  )
+  parser.add_argument(
+      "--backend",
+      choices=["torch", "onnx", "ctranslate2"],
+      default=SERVICE_CONFIG.backend,
+      help=(
+          "Inference runtime; onnx needs optimum[onnxruntime] and fetch.py --export-onnx, "
+          "ctranslate2 needs ctranslate2 and fetch.py --convert-ctranslate2."
+      ),
+  )
+  parser.add_argument("--onnx-path", default=None, help="ONNX export directory (default: <model-path>/onnx).")
+  parser.add_argument(
+      "--ctranslate2-path",
+      default=None,
+      help="CTranslate2 model directory (default: registry entry, then <model-path>/ctranslate2).",
   )
   parser.add_argument("--beam-size", type=int, default=SERVICE_CONFIG.beam_size)
-  parser.add_argument("--max-length", type=int, default=SERVICE_CONFIG.max_length)
+  parser.add_argument(
+      "--max-length",
+      type=int,
+      default=SERVICE_CONFIG.max_length,
+      help="Hard ceiling on decoder length; the per-request budget is usually much lower.",
+  )
+  parser.add_argument(
+      "--length-ratios",
+      default=None,
+      help='JSON file of target tokens per source token, e.g. {"default": 2.0, "ja": 2.5}.',
+  )
+  parser.add_argument(
+      "--decode-slack",
+      type=int,
+      default=SERVICE_CONFIG.decode_slack,
+      help="Extra decoder tokens allowed on top of the length ratio (helps very short strings).",
+  )
   parser.add_argument("--host", default="127.0.0.1")
   parser.add_argument("--port", type=int, default=9600)
   parser.add_argument("--no-preload", action="store_true", help="Lazy-load the model on first request.")
+  parser.add_argument(
+      "--max-queue",
+      type=int,
+      default=SERVICE_CONFIG.max_queue,
+      help="Max inference calls running or waiting before /translate answers 503.",
+  )
+  parser.add_argument(
+      "--inference-threads",
+      type=int,
+      default=SERVICE_CONFIG.inference_threads,
+      help="Max generate calls allowed to run against the model concurrently.",
+  )
+  parser.add_argument(
+      "--workers",
+      type=int,
+      default=SERVICE_CONFIG.workers,
+      help="Inference processes sharing the memory-mapped weights; requests go to the least-loaded one.",
+  )
+  parser.add_argument(
+      "--decoding-policy",
+      choices=sorted(DECODING_POLICIES),
+      default=SERVICE_CONFIG.decoding_policy,
+      help="How beam width is chosen per request: 'fixed' always uses --beam-size; 'adaptive' narrows it for short sources and under load.",
+  )
+  parser.add_argument(
+      "--beam-tiers",
+      default=",".join(":".join(str(value) for value in tier) for tier in SERVICE_CONFIG.beam_tiers),
+      help="Adaptive policy tiers as max_source_tokens:beam[:no_repeat_ngram_size], e.g. '6:1,20:2'.",
+  )
+  parser.add_argument(
+      "--no-repeat-ngram-size",
+      type=int,
+      default=SERVICE_CONFIG.no_repeat_ngram_size,
+      help="Block repeated n-grams of this size while decoding (0 disables).",
+  )
+  parser.add_argument(
+      "--busy-load",
+      type=float,
+      default=SERVICE_CONFIG.busy_load,
+      help="Queue fill ratio (0-1) above which bulk requests are degraded one step at a time.",
+  )
+  parser.add_argument(
+      "--latency-slo-ms",
+      type=float,
+      default=SERVICE_CONFIG.latency_slo_ms,
+      help="p95 target for interactive requests; bulk work is degraded while it is at risk (0 disables).",
+  )
+  parser.add_argument(
+      "--degraded-max-length",
+      type=int,
+      default=SERVICE_CONFIG.degraded_max_length,
+      help="max_length cap for bulk work at the highest degradation level.",
+  )
+  parser.add_argument(
+      "--warmup-rounds",
+      type=int,
+      default=SERVICE_CONFIG.warmup_rounds,
+      help="Synthetic translation rounds to run after loading, before /health reports ready (0 disables).",
+  )
+  parser.add_argument(
+      "--warmup-languages",
+      default=",".join(SERVICE_CONFIG.warmup_languages),
+      help="Comma-separated target languages used during warmup; match the languages your projects use.",
+  )
+  parser.add_argument(
+      "--compile",
+      action="store_true",
+      help="Run the torch backend under inference_mode with torch.compile'd encoder and decoder (slow first start).",
+  )
+  parser.add_argument(
+      "--compile-cache-dir",
+      default=str(SERVICE_CONFIG.compile_cache_dir),
+      help="Where compiled kernels are cached so later starts skip compilation.",
+  )
+  parser.add_argument(
+      "--length-buckets",
+      default=",".join(str(bucket) for bucket in SERVICE_CONFIG.length_buckets),
+      help="Comma-separated source widths inputs are padded to with --compile.",
+  )
+  parser.add_argument(
+      "--intra-op-threads",
+      type=int,
+      default=None,
+      help="Threads each generate call uses (torch.set_num_threads; per worker with --workers).",
+  )
+  parser.add_argument(
+      "--inter-op-threads",
+      type=int,
+      default=None,
+      help="Threads for independent ops running in parallel (torch.set_num_interop_threads).",
+  )
+  parser.add_argument(
+      "--cpu-affinity",
+      default=None,
+      help="Pin inference to these cores, e.g. '0-7' or '0,2,4-6' (Linux); split evenly across --workers.",
+  )
+  parser.add_argument(
+      "--max-batch-rows",
+      type=int,
+      default=SERVICE_CONFIG.max_batch_rows,
+      help="Max (source string x target language) rows per generate call in /translate/batch.",
+  )
+  parser.add_argument(
+      "--batch-window-ms",
+      type=float,
+      default=SERVICE_CONFIG.batch_window_ms,
+      help="How long /translate waits to coalesce concurrent requests into one batch (0 disables).",
+  )
+  parser.add_argument(
+      "--max-batch-tokens",
+      type=int,
+      default=SERVICE_CONFIG.max_batch_tokens,
+      help="Source tokens x target languages allowed in one coalesced batch.",
+  )
+  parser.add_argument(
+      "--cache-entries",
+      type=int,
+      default=SERVICE_CONFIG.cache_entries,
+      help="Max translations kept in the in-memory LRU cache (0 disables it).",
+  )
+  parser.add_argument(
+      "--cache-max-mb",
+      type=int,
+      default=SERVICE_CONFIG.cache_max_bytes // (1024 * 1024),
+      help="Max memory used by the in-memory translation cache, in MiB.",
+  )
+  parser.add_argument(
+      "--translation-memory",
+      default=str(SERVICE_CONFIG.translation_memory),
+      help="SQLite file that persists translations across restarts.",
+  )
+  parser.add_argument(
+      "--no-translation-memory",
+      action="store_true",
+      help="Keep translations in memory only.",
+  )
   return parser.parse_args()
 
 
@@ -234,10 +2640,45 @@ def main() -> None:
       model_path=Path(args.model_path).expanduser().resolve(),
       device=args.device,
       precision=args.precision,
+      backend=args.backend,
+      onnx_path=Path(args.onnx_path).expanduser().resolve() if args.onnx_path else None,
+      ctranslate2_path=Path(args.ctranslate2_path).expanduser().resolve() if args.ctranslate2_path else None,
       beam_size=args.beam_size,
       max_length=args.max_length,
       preload=not args.no_preload,
+      max_queue=args.max_queue,
+      inference_threads=args.inference_threads,
+      workers=max(1, args.workers),
+      intra_op_threads=args.intra_op_threads,
+      inter_op_threads=args.inter_op_threads,
+      cpu_affinity=parse_core_list(args.cpu_affinity) if args.cpu_affinity else None,
+      max_batch_rows=args.max_batch_rows,
+      batch_window_ms=args.batch_window_ms,
+      max_batch_tokens=args.max_batch_tokens,
+      cache_entries=args.cache_entries,
+      cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+      translation_memory=None if args.no_translation_memory else Path(args.translation_memory).expanduser(),
+      length_ratios=(
+          load_length_ratios(Path(args.length_ratios).expanduser())
+          if args.length_ratios
+          else dict(DEFAULT_LENGTH_RATIOS)
+      ),
+      decode_slack=args.decode_slack,
+      decoding_policy=args.decoding_policy,
+      beam_tiers=parse_beam_tiers(args.beam_tiers),
+      no_repeat_ngram_size=max(0, args.no_repeat_ngram_size),
+      busy_load=args.busy_load,
+      latency_slo_ms=max(0.0, args.latency_slo_ms),
+      degraded_max_length=args.degraded_max_length,
+      warmup_rounds=max(0, args.warmup_rounds),
+      compile=args.compile,
+      compile_cache_dir=Path(args.compile_cache_dir).expanduser(),
+      length_buckets=sorted({int(bucket) for bucket in args.length_buckets.split(",") if bucket.strip()}),
+      warmup_languages=[lang.strip() for lang in args.warmup_languages.split(",") if lang.strip()],
   )
+  if config.compile and config.backend != "torch":
+    LOGGER.warning("--compile only applies to the torch backend; ignoring it for %s.", config.backend)
+    config.compile = False
   configure_service(config)
 
   if not config.model_path.exists():
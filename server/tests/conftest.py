@@ -0,0 +1,33 @@
+"""Shared fixtures: the tiny random model from ``make_fixture.py``, loaded once per session."""
+from __future__ import annotations
+
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+MAKE_FIXTURE = SERVER_DIR.parent / "scripts" / "m2m100" / "make_fixture.py"
+sys.path.insert(0, str(SERVER_DIR))
+
+import m2m100_service as service  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def fixture_model(tmp_path_factory: pytest.TempPathFactory) -> Path:
+  target_dir = tmp_path_factory.mktemp("m2m100_tiny")
+  subprocess.run([sys.executable, str(MAKE_FIXTURE), "--target-dir", str(target_dir)], check=True, capture_output=True)
+  return target_dir
+
+
+@pytest.fixture(scope="session")
+def loaded_service(fixture_model: Path):
+  """The service module with the fixture loaded on one inference thread and no translation memory."""
+  service.configure_service(
+      service.ServiceConfig(model_path=fixture_model, translation_memory=None, warmup_rounds=0)
+  )
+  asyncio.run(service.load_runtime())
+  yield service
+  service._inference_queue.shutdown()
@@ -0,0 +1,251 @@
+"""Tests for the local M2M100 service, run against the tiny random fixture model.
+
+The fixture's translations are noise, and its rows almost never reach EOS within the
+decode budget, so these tests check plumbing (batching, caching, dedup, streaming)
+rather than translation quality. Tests that need finished rows force EOS with a
+logits processor.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Dict
+
+import httpx
+
+import m2m100_service as service
+
+
+def key(text: str, target: str = "fr", precision: str = "float32") -> service.CacheKey:
+  return (text, "", "en", target, 1, 200, 3, "tiny-random", "torch", precision)
+
+
+def entry_bytes(cache_key: service.CacheKey, translation: str) -> int:
+  return len(translation.encode("utf-8")) + sum(len(str(part).encode("utf-8")) for part in cache_key)
+
+
+async def post(path: str, payload: Dict[str, Any]) -> httpx.Response:
+  transport = httpx.ASGITransport(app=service.app)
+  async with httpx.AsyncClient(transport=transport, base_url="http://locax.test") as client:
+    return await client.post(path, json=payload)
+
+
+class RecordingQueue:
+  """Runs calls on a real ``InferenceQueue`` and records the texts of each batch."""
+
+  def __init__(self) -> None:
+    self.inner = service.InferenceQueue(max_pending=8)
+    self.batches: list[list[str]] = []
+
+  async def run(self, func: Any, *args: Any, progress: Any = None) -> Any:
+    self.batches.append(list(args[0]))
+    return await self.inner.run(func, *args, progress=progress)
+
+
+class ForceEos:
+  """Logits processor that makes row ``i`` emit EOS after ``every * (i + 1)`` tokens."""
+
+  def __init__(self, eos_token_id: int, every: int) -> None:
+    self.eos_token_id = eos_token_id
+    self.every = every
+
+  def __call__(self, input_ids: Any, scores: Any) -> Any:
+    step = input_ids.shape[1] - 2  # after [decoder_start, <lang>]
+    for row in range(scores.shape[0]):
+      if step == self.every * (row + 1):
+        scores[row, :] = -float("inf")
+        scores[row, self.eos_token_id] = 0.0
+    return scores
+
+
+def test_cache_evicts_least_recently_used_entry() -> None:
+  cache = service.TranslationCache(max_entries=2, max_bytes=10_000)
+  cache.put(key("save"), "enregistrer")
+  cache.put(key("open"), "ouvrir")
+  assert cache.get(key("save")) == "enregistrer"  # now the most recent
+
+  cache.put(key("close"), "fermer")
+
+  assert cache.get(key("open")) is None
+  assert cache.get(key("save")) == "enregistrer"
+  assert cache.get(key("close")) == "fermer"
+  assert cache.stats()["entries"] == 2
+
+
+def test_cache_evicts_by_bytes_and_skips_oversized_entries() -> None:
+  budget = entry_bytes(key("save"), "enregistrer") + entry_bytes(key("open"), "ouvrir")
+  cache = service.TranslationCache(max_entries=100, max_bytes=budget)
+  cache.put(key("save"), "enregistrer")
+  cache.put(key("open"), "ouvrir")
+  cache.put(key("close"), "fermer")
+
+  assert cache.get(key("save")) is None
+  assert cache.stats()["bytes"] <= budget
+
+  cache.put(key("long"), "x" * budget)
+  assert cache.get(key("long")) is None
+  assert cache.get(key("close")) == "fermer"
+
+
+def test_cache_with_zero_limit_is_disabled() -> None:
+  cache = service.TranslationCache(max_entries=0, max_bytes=10_000)
+  cache.put(key("save"), "enregistrer")
+  assert cache.get(key("save")) is None
+  assert cache.stats() == {"entries": 0, "bytes": 0, "hits": 0, "misses": 0}
+
+
+def test_memory_round_trips_across_restarts(tmp_path) -> None:
+  path = tmp_path / "memory.sqlite3"
+  memory = service.TranslationMemory(path)
+  memory.record(key("save"), "enregistrer")
+  memory.record(key("save", target="de"), "speichern")
+  memory.record(key("save"), "sauvegarder")  # replaces the first row
+  memory.close()  # flushes the background writer
+
+  reopened = service.TranslationMemory(path)
+  try:
+    found = reopened.lookup_many([key("save"), key("save", target="de"), key("save", precision="float16"), key("open")])
+    assert found == {key("save"): "sauvegarder", key("save", target="de"): "speichern"}
+    stats = reopened.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (2, 2, 2)
+  finally:
+    reopened.close()
+
+
+def test_decode_budget_scales_with_source_length() -> None:
+  budget = service.DecodeBudget({"default": 1.5, "ja": 2.0}, slack=4)
+  assert budget.max_new_tokens(10, "fr", ceiling=200) == 19  # ceil(10 * 1.5) + 4
+  assert budget.max_new_tokens(10, "ja", ceiling=200) == 24
+  assert budget.max_new_tokens(100, "fr", ceiling=50) == 50
+  assert service.DecodeBudget({"default": 1.5}, slack=0).max_new_tokens(0, "fr", ceiling=200) == 1
+
+
+def test_decode_budget_learns_only_from_finished_rows() -> None:
+  budget = service.DecodeBudget({"default": 1.0}, slack=0, headroom=1.5, smoothing=1.0)
+  budget.observe("fr", 10, 40, finished=False)
+  assert budget.ratio("fr") == 1.0
+
+  budget.observe("fr", 10, 20, finished=True)
+  assert budget.ratio("fr") == 3.0  # 20 / 10 * headroom
+  assert budget.max_new_tokens(10, "fr", ceiling=200) == 30
+  assert budget.ratio("de") == 1.0
+
+  budget.observe("fr", 10, 2, finished=True)
+  assert budget.ratio("fr") == 1.0  # never below the configured ratio
+
+
+def test_micro_batcher_coalesces_requests_with_the_same_decode_settings(loaded_service) -> None:
+  queue = RecordingQueue()
+  batcher = service.MicroBatcher(queue, window_ms=50, max_batch_tokens=10_000)
+
+  async def submit_all() -> list[service.TranslationOutput]:
+    return await asyncio.gather(
+        batcher.submit("save", ["fr"], "en", 32, 1, 3),
+        batcher.submit("open the file", ["de", "fr"], "en", 32, 1, 3),
+        batcher.submit("close", ["fr"], "en", 32, 2, 3),  # another beam size: its own batch
+    )
+
+  try:
+    outputs = asyncio.run(submit_all())
+  finally:
+    queue.inner.shutdown()
+
+  assert sorted(queue.batches) == [["close"], ["save", "open the file"]]
+  assert [sorted(output.translations) for output in outputs] == [["fr"], ["de", "fr"], ["fr"]]
+  assert outputs[1].usage["de"]["input_tokens"] == service.count_tokens(["open the file"])[0]
+
+
+def test_micro_batcher_flushes_a_full_group_without_waiting(loaded_service) -> None:
+  queue = RecordingQueue()
+  # Each request alone fills the token budget.
+  batcher = service.MicroBatcher(queue, window_ms=60_000, max_batch_tokens=1)
+
+  async def submit_all() -> list[service.TranslationOutput]:
+    return await asyncio.wait_for(
+        asyncio.gather(
+            batcher.submit("save", ["fr"], "en", 32, 1, 3),
+            batcher.submit("open", ["fr"], "en", 32, 1, 3),
+        ),
+        timeout=30,
+    )
+
+  try:
+    asyncio.run(submit_all())
+  finally:
+    queue.inner.shutdown()
+
+  assert queue.batches == [["save"], ["open"]]
+
+
+def test_batch_translates_duplicate_sources_once(loaded_service, monkeypatch) -> None:
+  generated: list[str] = []
+  generate = service.generate_batch_with_usage
+
+  def recording_generate(texts: list[str], *args: Any) -> list[service.TranslationOutput]:
+    generated.extend(texts)
+    return generate(texts, *args)
+
+  monkeypatch.setattr(service, "generate_batch_with_usage", recording_generate)
+  response = asyncio.run(post("/translate/batch", {
+      "items": [
+          {"key": "menu.save", "source_text": "Save"},
+          {"key": "dialog.save", "source_text": " Save "},
+          {"key": "menu.open", "source_text": "Open"},
+          {"key": "toolbar.save", "source_text": "Save", "context": "toolbar"},
+      ],
+      "target_languages": ["fr", "de"],
+      "source_language": "en",
+      "use_cache": False,
+  }))
+
+  assert response.status_code == 200
+  body = response.json()
+  assert sorted(generated) == ["Open", "Save", "toolbar\nSave"]
+  assert body["translations"]["dialog.save"] == body["translations"]["menu.save"]
+  assert body["usage"]["menu.save"]["fr"]["source"] == "model"
+  assert body["usage"]["dialog.save"] == {lang: service.cached_usage("duplicate") for lang in ["fr", "de"]}
+  assert body["usage"]["toolbar.save"]["fr"]["source"] == "model"
+
+
+def test_stream_sends_each_language_as_its_row_finishes(loaded_service, monkeypatch) -> None:
+  model = service._backend.model
+  generate = model.generate
+  force_eos = ForceEos(service._backend.eos_token_id, every=4)
+  monkeypatch.setattr(model, "generate", lambda **kwargs: generate(logits_processor=[force_eos], **kwargs))
+  response = asyncio.run(post("/translate/stream", {
+      "source_text": "open the project settings",
+      "target_languages": ["fr", "de", "ja"],
+      "source_language": "en",
+      "max_length": 128,
+      "beam_size": 1,
+      "use_cache": False,
+  }))
+
+  events = [json.loads(line) for line in response.text.splitlines()]
+  rows, done = events[:-1], events[-1]
+  assert [event["language"] for event in rows] == ["fr", "de", "ja"]
+  assert [event["usage"]["output_tokens"] for event in rows] == [4, 8, 12]
+  generate_ms = [event["generate_ms"] for event in rows]
+  assert generate_ms == sorted(generate_ms) and len(set(generate_ms)) == 3
+  assert done["done"] is True
+  assert {lang: usage["output_tokens"] for lang, usage in done["usage"].items()} == {"fr": 4, "de": 8, "ja": 12}
+
+
+def test_stream_reports_unexpected_errors_and_still_finishes(loaded_service, monkeypatch) -> None:
+  def fail(*args: Any, **kwargs: Any) -> None:
+    raise RuntimeError("worker died")
+
+  monkeypatch.setattr(service._backend, "generate", fail)
+  response = asyncio.run(post("/translate/stream", {
+      "source_text": "save",
+      "target_languages": ["fr", "de"],
+      "source_language": "en",
+      "use_cache": False,
+  }))
+
+  events = [json.loads(line) for line in response.text.splitlines()]
+  assert [(event.get("language"), event.get("error")) for event in events[:-1]] == [
+      ("fr", "RuntimeError: worker died"),
+      ("de", "RuntimeError: worker died"),
+  ]
+  assert events[-1]["done"] is True
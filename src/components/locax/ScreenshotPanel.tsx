@@ -157,6 +157,15 @@ export const ScreenshotPanel = ({
         return;
       }
 
+      // Local M2M100 streams cached languages before the generated ones; show each as soon as it lands.
+      const streamed: Record<string, string> = {};
+      const applyStreamedTranslation = (language: string, translation: string) => {
+        streamed[language] = translation;
+        onUpdateRow(selectedRow.key, {
+          translations: { ...selectedRow.translations, ...streamed },
+        });
+      };
+
       const translations = await generateTranslations({
         apiKey: aiApiKey,
         sourceText,
@@ -165,6 +174,7 @@ export const ScreenshotPanel = ({
         provider,
         model: aiModel,
         endpoint: aiEndpoint,
+        onTranslation: provider === "m2m100" ? applyStreamedTranslation : undefined,
       });
 
       if (Object.keys(translations).length === 0) {
@@ -36,6 +36,8 @@ interface TranslationRequest {
   model?: string;
   endpoint?: string;
   sourceLanguage?: string;
+  /** Called as each language arrives when the provider can stream (currently M2M100). */
+  onTranslation?: (language: string, translation: string) => void;
 }
 
 export async function generateTranslations({
@@ -47,6 +49,7 @@ export async function generateTranslations({
   model,
   endpoint,
   sourceLanguage = "en",
+  onTranslation,
 }: TranslationRequest): Promise<Record<string, string>> {
   if (providersRequiringKeys.includes(provider) && !apiKey) {
     throw new Error("Missing AI API key.");
@@ -83,13 +86,16 @@ export async function generateTranslations({
     });
   } else if (provider === "m2m100") {
     const resolvedEndpoint = sanitizeEndpointUrl(endpoint, DEFAULT_M2M100_ENDPOINT);
-    responseContent = await requestM2M100Translation({
+    const m2m100Payload = {
       endpoint: resolvedEndpoint,
       sourceText: trimmedText,
       languages,
       context,
       sourceLanguage,
-    });
+    };
+    responseContent = onTranslation
+      ? await requestM2M100StreamingTranslation({ ...m2m100Payload, onTranslation })
+      : await requestM2M100Translation(m2m100Payload);
   } else {
     responseContent = await requestOpenAITranslation({ apiKey: apiKey!, userPrompt });
   }
@@ -121,6 +127,27 @@ interface M2M100RequestPayload {
   sourceLanguage?: string;
 }
 
+interface M2M100StreamingRequestPayload extends M2M100RequestPayload {
+  onTranslation: (language: string, translation: string) => void;
+}
+
+type M2M100Usage = {
+  source: "model" | "cache";
+  input_tokens: number;
+  output_tokens: number;
+  decode_steps: number;
+};
+
+type M2M100StreamEvent = {
+  language?: string;
+  translation?: string;
+  error?: string;
+  status?: number;
+  done?: boolean;
+  usage?: Record<string, M2M100Usage>;
+  timing_ms?: Record<string, number>;
+};
+
 async function requestOpenAITranslation({ apiKey, userPrompt }: ProviderRequestPayload): Promise<string> {
   const response = await fetch(OPENAI_CHAT_URL, {
     method: "POST",
@@ -309,10 +336,120 @@ async function requestM2M100Translation({
   if (!translations || typeof translations !== "object") {
     throw new Error("Local service returned an unexpected payload.");
   }
+  logM2M100Usage(data?.usage, parseServerTiming(response.headers.get("Server-Timing")));
 
   return JSON.stringify(translations);
 }
 
+async function requestM2M100StreamingTranslation({
+  endpoint,
+  sourceText,
+  languages,
+  context,
+  sourceLanguage = "en",
+  onTranslation,
+}: M2M100StreamingRequestPayload): Promise<string> {
+  const response = await fetch(`${endpoint}/translate/stream`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      Accept: "application/x-ndjson",
+    },
+    body: JSON.stringify({
+      source_text: sourceText,
+      target_languages: languages,
+      context: context?.trim() || undefined,
+      source_language: sourceLanguage,
+    }),
+  });
+
+  if (!response.ok || !response.body) {
+    const errorText = await safeReadText(response);
+    throw new Error(errorText || "Translation request failed.");
+  }
+
+  const translations: Record<string, string> = {};
+  const failures: Record<string, string> = {};
+  let finished = false;
+  const handleLine = (line: string) => {
+    if (!line.trim()) {
+      return;
+    }
+    const event: M2M100StreamEvent = JSON.parse(line);
+    if (event.done) {
+      finished = true;
+      logM2M100Usage(event.usage, event.timing_ms);
+      return;
+    }
+    if (event.error) {
+      failures[event.language ?? "unknown"] = event.error;
+      return;
+    }
+    const translation = event.translation?.trim();
+    if (event.language && translation && languages.includes(event.language)) {
+      translations[event.language] = translation;
+      onTranslation(event.language, translation);
+    }
+  };
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) {
+      break;
+    }
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split("\n");
+    buffer = lines.pop() ?? "";
+    lines.forEach(handleLine);
+  }
+  handleLine(buffer + decoder.decode());
+
+  if (!finished) {
+    throw new Error("Local service stream ended before all languages were translated.");
+  }
+  const failed = Object.keys(failures);
+  if (failed.length) {
+    // Languages that did arrive were already applied through onTranslation.
+    const reasons = Array.from(new Set(Object.values(failures))).join("; ");
+    throw new Error(`Local service could not translate ${failed.join(", ")}: ${reasons}`);
+  }
+
+  return JSON.stringify(translations);
+}
+
+function parseServerTiming(header: string | null): Record<string, number> | undefined {
+  if (!header) {
+    return undefined;
+  }
+  const timings: Record<string, number> = {};
+  header.split(",").forEach((entry) => {
+    const [name, ...params] = entry.trim().split(";");
+    const duration = params.find((param) => param.trim().startsWith("dur="));
+    if (name && duration) {
+      timings[name] = Number(duration.trim().slice(4));
+    }
+  });
+  return timings;
+}
+
+function logM2M100Usage(usage: Record<string, M2M100Usage> | undefined, timings?: Record<string, number>) {
+  if (!usage) {
+    return;
+  }
+  const rows = Object.values(usage);
+  console.info("M2M100 usage", {
+    inputTokens: rows.reduce((sum, row) => sum + row.input_tokens, 0),
+    outputTokens: rows.reduce((sum, row) => sum + row.output_tokens, 0),
+    decodeSteps: rows.reduce((sum, row) => sum + row.decode_steps, 0),
+    cached: rows.filter((row) => row.source !== "model").length,
+    languages: usage,
+    timingsMs: timings,
+  });
+}
+
 function parseTranslationContent(content: string, provider: AIProvider): Record<string, unknown> {
   try {
     return JSON.parse(content);